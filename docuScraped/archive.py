@@ -0,0 +1,113 @@
+import gzip
+import io
+import json
+import os
+import shutil
+import uuid
+from datetime import datetime, timezone
+from http import HTTPStatus
+
+from urlset import FingerprintSet
+
+ARCHIVE_FILE = "crawl_archive.warc.gz"
+
+# Cabeceras que describen la transferencia original y no el cuerpo guardado,
+# que se almacena ya descomprimido y con su propia longitud
+_TRANSFER_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+def index_path(archive_path):
+    return archive_path + ".idx"
+
+class ArchiveWriter:
+    """Archivo de respuestas HTTP en bruto, en formato WARC comprimido y solo de añadido
+
+    Cada respuesta es un miembro gzip independiente, como en los .warc.gz estándar,
+    de modo que el fichero se puede leer con herramientas WARC y un registro se
+    puede descomprimir por separado a partir de su posición. Las posiciones se
+    apuntan en un índice (una línea JSON por registro) para re-extraer en paralelo.
+    """
+
+    def __init__(self, path=ARCHIVE_FILE):
+        self.path = path
+        # URLs ya archivadas: huellas de 64 bits leídas del índice línea a línea, no sus textos
+        self.urls = FingerprintSet()
+        if os.path.exists(index_path(path)):
+            self.urls.update(entry["url"] for entry in index_entries(path))
+        self._file = open(path, "ab")
+        self._index = open(index_path(path), "a", encoding="utf-8")
+
+    def write_response(self, url, status, headers, body):
+        """Añade una respuesta; `body` puede ser bytes o un fichero binario abierto"""
+        if isinstance(body, bytes):
+            body = io.BytesIO(body)
+        body.seek(0, os.SEEK_END)
+        body_length = body.tell()
+        body.seek(0)
+
+        reason = HTTPStatus(status).phrase if status in HTTPStatus._value2member_map_ else ""
+        http_head = [f"HTTP/1.1 {status} {reason}"]
+        http_head += [f"{name}: {value}" for name, value in headers.items()
+                      if name.lower() not in _TRANSFER_HEADERS]
+        http_head.append(f"Content-Length: {body_length}")
+        http_head = ("\r\n".join(http_head) + "\r\n\r\n").encode("utf-8")
+
+        date = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        warc_head = (
+            "WARC/1.0\r\n"
+            "WARC-Type: response\r\n"
+            f"WARC-Target-URI: {url}\r\n"
+            f"WARC-Date: {date}\r\n"
+            f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+            "Content-Type: application/http; msgtype=response\r\n"
+            f"Content-Length: {len(http_head) + body_length}\r\n\r\n"
+        ).encode("utf-8")
+
+        offset = self._file.tell()
+        with gzip.GzipFile(fileobj=self._file, mode="wb") as member:
+            member.write(warc_head)
+            member.write(http_head)
+            shutil.copyfileobj(body, member)
+            member.write(b"\r\n\r\n")
+        self._file.flush()
+
+        self._index.write(json.dumps({"url": url, "offset": offset, "date": date}) + "\n")
+        self._index.flush()
+        self.urls.add(url)
+
+    def close(self):
+        self._file.close()
+        self._index.close()
+
+def _read_headers(stream):
+    headers = {}
+    while True:
+        line = stream.readline().decode("utf-8").rstrip("\r\n")
+        if not line:
+            return headers
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+def read_record(path, offset):
+    """Lee el registro que empieza en `offset` y devuelve (url, estado, cabeceras, cuerpo)"""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        # GzipFile seguiría con los miembros siguientes, pero solo se lee uno
+        stream = gzip.GzipFile(fileobj=f)
+        stream.readline()  # WARC/1.0
+        warc_headers = _read_headers(stream)
+        status_line = stream.readline().decode("utf-8")
+        status = int(status_line.split()[1])
+        http_headers = _read_headers(stream)
+        body = stream.read(int(http_headers.get("content-length", 0)))
+    return warc_headers["warc-target-uri"], status, http_headers, body
+
+def index_entries(path):
+    """Entradas del índice ({url, offset, date}) en orden de escritura, sin cargarlo entero"""
+    with open(index_path(path), encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def latest_offsets(path):
+    """Posición del registro más reciente de cada URL, según el índice"""
+    return {entry["url"]: entry["offset"] for entry in index_entries(path)}
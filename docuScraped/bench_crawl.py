@@ -0,0 +1,215 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import resource
+import tempfile
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BASELINE_FILE = "bench_baseline.json"
+SIZES = [100, 1000, 10000]
+
+# Forma del sitio sintético
+FANOUT = 8             # Enlaces de cada página a sus hijas en el árbol
+PARAGRAPHS = 20        # Tamaño del artículo
+NAV_LINKS = 60         # Barra lateral repetida en todas las páginas
+
+# El limitador real está pensado para no molestar a un servidor ajeno; contra el
+# servidor local se sube para medir el crawler y no la cortesía
+BENCH_RATE = 10000
+
+SITE_PATH = "/docs/"
+
+def page_path(index):
+    return SITE_PATH if index == 0 else f"{SITE_PATH}page_{index}/"
+
+def make_site_page(index, pages, fanout=FANOUT, paragraphs=PARAGRAPHS, nav_links=NAV_LINKS):
+    """Página con la forma de MkDocs enlazada en árbol: la página i enlaza a sus `fanout` hijas"""
+    nav = "".join(
+        f'<li class="md-nav__item"><a class="md-nav__link" href="{page_path(i)}">Sección {i}</a></li>'
+        for i in range(min(nav_links, pages))
+    )
+    children = range(index * fanout + 1, min(pages, (index + 1) * fanout + 1))
+    body = "".join(
+        f"<h2>Apartado {p}</h2><p>Párrafo {p} de la página {index} con <code>código</code>.</p>"
+        f"<pre><code>def ejemplo_{p}():\n    return {p}</code></pre>"
+        for p in range(paragraphs)
+    )
+    body += "".join(f'<p><a href="{page_path(child)}">Página {child}</a></p>' for child in children)
+    return (
+        "<!doctype html><html><head><meta charset='utf-8'><title>Página</title>"
+        "<style>.md-nav{display:block}</style><script>var config = {};</script></head><body>"
+        "<header class='md-header'><a href='#content'>Skip to content</a></header>"
+        f"<div class='md-sidebar'><nav class='md-nav'><ul>{nav}</ul></nav></div>"
+        f"<article class='md-content__inner'><h1>Página {index}</h1>{body}</article>"
+        "<footer class='md-footer'>Made with Material for MkDocs</footer></body></html>"
+    ).encode("utf-8")
+
+class SiteHandler(BaseHTTPRequestHandler):
+    """Sirve el sitio sintético con latencia y errores inyectados"""
+
+    protocol_version = "HTTP/1.1"   # Keep-alive, como un servidor real
+    disable_nagle_algorithm = True  # Cabeceras y cuerpo van en escrituras separadas
+    pages = 0
+    latency = 0.0
+    error_rate = 0.0
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(random.uniform(0.5, 1.5) * self.latency)
+
+        index = self._page_index()
+        if index is None:
+            self._send(404, b"Not found")
+        elif random.random() < self.error_rate:
+            self._send(503, b"Service unavailable")
+        else:
+            self._send(200, make_site_page(index, self.pages))
+
+    def _page_index(self):
+        path = self.path.split("?")[0]
+        if path == SITE_PATH:
+            return 0
+        name = path[len(SITE_PATH):].strip("/")
+        if path.startswith(SITE_PATH) and name.startswith("page_") and name[5:].isdigit():
+            index = int(name[5:])
+            return index if index < self.pages else None
+        return None
+
+    def _send(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def serve(pages, latency, error_rate, port_pipe):
+    """Proceso servidor: así su CPU y su memoria no cuentan en la medición"""
+    SiteHandler.pages = pages
+    SiteHandler.latency = latency
+    SiteHandler.error_rate = error_rate
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SiteHandler)
+    server.daemon_threads = True
+    port_pipe.send(server.server_address[1])
+    server.serve_forever()
+
+def run_crawl(base_url, pages, concurrency, parse_workers, result_pipe):
+    """Proceso del crawler: recorre el sitio en un directorio temporal y mide sus recursos"""
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        # Los mensajes por página falsearían la medición y llenarían la pantalla
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, 1)
+
+        import crawler
+        from rate_limiter import HostRateLimiter
+
+        config = crawler.SiteConfig(base_url, "docs_txt", max_depth=pages, max_pages=pages,
+                                    use_sitemap=False)
+
+        started = time.monotonic()
+        site, = asyncio.run(crawler.crawl_sites(
+            [config], max_concurrency=concurrency, parse_workers=parse_workers,
+            rate_limiter=HostRateLimiter(initial_rate=BENCH_RATE, max_rate=BENCH_RATE),
+        ))
+        elapsed = time.monotonic() - started
+
+    # Los procesos de análisis ya terminaron, así que cuentan como hijos
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+    pages_done = len(site.visited_urls)
+    result_pipe.send({
+        "pages": pages_done,
+        "elapsed": elapsed,
+        "pages_per_second": pages_done / elapsed if elapsed else 0.0,
+        "cpu_ms_per_page": cpu * 1000 / pages_done if pages_done else None,
+        # ru_maxrss está en KB en Linux
+        "peak_rss_mb": own.ru_maxrss / 1024,
+        "peak_parse_rss_mb": children.ru_maxrss / 1024,
+        "errors": site.metrics.outcomes["error"],
+        "retries": site.metrics.retries,
+    })
+
+def bench(pages, latency, error_rate, concurrency, parse_workers):
+    # spawn en lugar de fork: el crawler arranca limpio y su memoria pico es solo suya
+    context = multiprocessing.get_context("spawn")
+
+    port_receiver, port_sender = context.Pipe(duplex=False)
+    server = context.Process(target=serve, args=(pages, latency, error_rate, port_sender),
+                             daemon=True)
+    server.start()
+    port_sender.close()
+    base_url = f"http://127.0.0.1:{port_receiver.recv()}{SITE_PATH}"
+
+    try:
+        result_receiver, result_sender = context.Pipe(duplex=False)
+        crawler = context.Process(target=run_crawl,
+                                  args=(base_url, pages, concurrency, parse_workers, result_sender))
+        crawler.start()
+        # Sin el extremo emisor en este proceso, recv() falla si el crawler muere
+        result_sender.close()
+        result = result_receiver.recv()
+        crawler.join()
+        return result
+    finally:
+        server.terminate()
+        server.join()
+
+def compare(result, baseline):
+    """Variación respecto a la referencia guardada, en porcentaje"""
+    changes = []
+    for key, label in (("pages_per_second", "pág/s"), ("cpu_ms_per_page", "CPU/pág"),
+                       ("peak_rss_mb", "RSS")):
+        if baseline.get(key) and result.get(key) is not None:
+            changes.append(f"{label} {(result[key] / baseline[key] - 1) * 100:+.0f}%")
+    return ", ".join(changes)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Mide el crawler contra un sitio de documentación sintético servido en local"
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES,
+                        help="Número de páginas de cada sitio a recorrer")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Latencia media inyectada por respuesta, en segundos")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fracción de respuestas que fallan con un 503")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--parse-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--baseline", default=BASELINE_FILE,
+                        help="Fichero JSON con los resultados de referencia")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Guarda estos resultados como nueva referencia")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = {}
+    for pages in args.sizes:
+        result = bench(pages, args.latency, args.error_rate, args.concurrency, args.parse_workers)
+        results[str(pages)] = result
+        line = (f"📄 {pages} páginas: {result['pages_per_second']:.1f} pág/s, "
+                f"{result['cpu_ms_per_page']:.2f} ms CPU/página, "
+                f"RSS {result['peak_rss_mb']:.0f} MB (análisis {result['peak_parse_rss_mb']:.0f} MB), "
+                f"{result['errors']} errores, {result['retries']} reintentos")
+        if str(pages) in baseline:
+            line += f" | vs referencia: {compare(result, baseline[str(pages)])}"
+        print(line)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({**baseline, **results}, f, indent=2)
+        print(f"💾 Referencia guardada en {args.baseline}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import argparse
+import time
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from extraction import PROFILES, parse_page
+
+PAGE_URL = "https://example.com/docs/section/page/"
+
+def make_page(index, paragraphs=40, nav_links=120):
+    """Genera una página con la forma de MkDocs: cabecera, barra lateral enorme y artículo"""
+    nav = "".join(
+        f'<li class="md-nav__item"><a class="md-nav__link" href="/docs/section_{i}/">Sección {i}</a></li>'
+        for i in range(nav_links)
+    )
+    body = "".join(
+        f"<h2>Apartado {p}</h2><p>Párrafo {p} de la página {index} con <code>código</code> "
+        f'y un <a href="../other_{p}/">enlace relativo</a>.</p>'
+        f"<pre><code>def ejemplo_{p}():\n    return {p}</code></pre>"
+        for p in range(paragraphs)
+    )
+    return (
+        "<!doctype html><html><head><meta charset='utf-8'><title>Página</title>"
+        "<style>.md-nav{display:block}</style><script>var config = {};</script></head><body>"
+        "<header class='md-header'><a href='#content'>Skip to content</a></header>"
+        f"<div class='md-sidebar'><nav class='md-nav'><ul>{nav}</ul></nav></div>"
+        f"<article class='md-content__inner'><h1>Página {index}</h1>{body}</article>"
+        "<footer class='md-footer'>Made with Material for MkDocs</footer></body></html>"
+    )
+
+def baseline_extract(html, page_url):
+    """Extracción original: dos análisis con html.parser (texto y enlaces por separado)"""
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(["script", "style", "nav", "header", "footer"]):
+        tag.decompose()
+    text = soup.get_text(separator="\n", strip=True)
+
+    soup = BeautifulSoup(html, "html.parser")
+    links = {urljoin(page_url, a["href"]) for a in soup.find_all("a", href=True) if a["href"]}
+    return text, sorted(links)
+
+def measure(extract, pages):
+    """Tiempo de CPU medio por página, en milisegundos"""
+    start = time.process_time()
+    for page in pages:
+        extract(page, PAGE_URL)
+    return (time.process_time() - start) * 1000 / len(pages)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara la extracción original con el análisis único con lxml")
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--paragraphs", type=int, default=40)
+    args = parser.parse_args()
+
+    html_pages = [make_page(i, args.paragraphs) for i in range(args.pages)]
+    byte_pages = [page.encode("utf-8") for page in html_pages]
+
+    # Ambas extracciones deben producir exactamente el mismo texto
+    assert baseline_extract(html_pages[0], PAGE_URL)[0] == parse_page(byte_pages[0], PAGE_URL, "utf-8")[0]
+
+    baseline_ms = measure(baseline_extract, html_pages)
+    lxml_ms = measure(lambda page, url: parse_page(page, url, "utf-8"), byte_pages)
+    profile_ms = measure(lambda page, url: parse_page(page, url, "utf-8", PROFILES["mkdocs"]), byte_pages)
+
+    size_kb = len(byte_pages[0]) / 1024
+    print(f"📄 {args.pages} páginas de {size_kb:.1f} KB")
+    print(f"🐢 html.parser x2: {baseline_ms:.2f} ms CPU/página")
+    print(f"🚀 lxml x1:        {lxml_ms:.2f} ms CPU/página")
+    print(f"📝 lxml + perfil mkdocs (Markdown): {profile_ms:.2f} ms CPU/página")
+    print(f"📊 Ahorro: {baseline_ms - lxml_ms:.2f} ms/página ({baseline_ms / lxml_ms:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import argparse
+import hashlib
+import re
+import sqlite3
+from collections import Counter
+
+from checkpoint import STATE_FILE, BUSY_TIMEOUT
+from store import open_output
+
+# Una línea que aparece en al menos esta fracción de páginas es boilerplate por sí sola.
+# Solo cuentan líneas de varias palabras: los fragmentos sueltos de código resaltado
+# ("(", "import", ",") se repiten en casi todas las páginas y son contenido.
+LINE_RATIO = 0.9
+MIN_LINE_WORDS = 2
+# Un bloque de BLOCK_LINES líneas seguidas repetido en esta fracción de páginas también
+# (la barra lateral completa, el pie, el selector de versión...)
+BLOCK_RATIO = 0.5
+BLOCK_LINES = 3
+MIN_BLOCK_CHARS = 40
+# Con menos páginas no hay corpus suficiente para distinguir la plantilla del contenido
+MIN_PAGES = 5
+# Valla de un bloque de código Markdown: tres o más ` y, al abrir, el lenguaje
+FENCE = re.compile(r"\s*(`{3,})(.*)$")
+
+def line_fingerprint(line):
+    """Huella de 64 bits de una línea, ignorando diferencias de espacios"""
+    return hashlib.blake2b(" ".join(line.split()).encode("utf-8"), digest_size=8).hexdigest()
+
+def block_fingerprints(line_hashes, size=BLOCK_LINES):
+    """Huellas de cada ventana de `size` líneas consecutivas, en orden"""
+    return [
+        hashlib.blake2b("".join(line_hashes[i:i + size]).encode("ascii"), digest_size=8).hexdigest()
+        for i in range(len(line_hashes) - size + 1)
+    ]
+
+def prose_lines(text):
+    """Líneas no vacías fuera de bloques de código Markdown, que nunca se tocan
+
+    Devuelve (índice de la línea en el texto, línea). Un bloque se cierra solo con
+    una valla sin lenguaje de al menos tantas ` como la que lo abrió: el código que
+    contiene ``` va entre vallas más largas.
+    """
+    fence = None
+    for index, line in enumerate(text.splitlines()):
+        match = FENCE.match(line)
+        if fence is None and match:
+            fence = len(match.group(1))
+        elif fence is not None:
+            if match and len(match.group(1)) >= fence and not match.group(2).strip():
+                fence = None
+        elif line.strip():
+            yield index, line
+
+class BoilerplateModel:
+    """Huellas de líneas y bloques que se repiten en todo el sitio, guardadas en SQLite
+
+    El modelo solo crece: una huella aprendida sigue quitándose en los recorridos
+    incrementales, en los que la mayoría de páginas ya están limpias y no la cuentan.
+    """
+
+    def __init__(self, path=STATE_FILE):
+        self.conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS boilerplate (
+                fingerprint TEXT PRIMARY KEY,
+                kind TEXT NOT NULL
+            )
+        """)
+        self.conn.commit()
+        self.lines = set()
+        self.blocks = set()
+        for fingerprint, kind in self.conn.execute("SELECT fingerprint, kind FROM boilerplate"):
+            (self.lines if kind == "line" else self.blocks).add(fingerprint)
+
+    def learn(self, texts):
+        """Cuenta en cuántas páginas aparece cada huella y guarda las frecuentes
+
+        Devuelve el número de huellas nuevas.
+        """
+        line_counts = Counter()
+        block_counts = Counter()
+        pages = 0
+        for text in texts:
+            lines = [line for _, line in prose_lines(text)]
+            line_hashes = [line_fingerprint(line) for line in lines]
+            # Frecuencia por página, no por aparición: una línea repetida en una sola página no cuenta
+            line_counts.update({
+                fingerprint for line, fingerprint in zip(lines, line_hashes)
+                if len(line.split()) >= MIN_LINE_WORDS
+            })
+            sizes = [len(line.strip()) for line in lines]
+            block_counts.update({
+                fingerprint for i, fingerprint in enumerate(block_fingerprints(line_hashes))
+                if sum(sizes[i:i + BLOCK_LINES]) >= MIN_BLOCK_CHARS
+            })
+            pages += 1
+
+        if pages < MIN_PAGES:
+            return 0
+
+        new = []
+        for counts, ratio, known, kind in ((line_counts, LINE_RATIO, self.lines, "line"),
+                                           (block_counts, BLOCK_RATIO, self.blocks, "block")):
+            threshold = max(MIN_PAGES, ratio * pages)
+            for fingerprint, count in counts.items():
+                if count >= threshold and fingerprint not in known:
+                    known.add(fingerprint)
+                    new.append((fingerprint, kind))
+
+        self.conn.executemany("INSERT OR IGNORE INTO boilerplate VALUES (?, ?)", new)
+        self.conn.commit()
+        return len(new)
+
+    def strip(self, text):
+        """Quita de la página las líneas aprendidas y las cubiertas por un bloque aprendido"""
+        prose = list(prose_lines(text))
+        line_hashes = [line_fingerprint(line) for _, line in prose]
+        remove = {index for (index, _), fingerprint in zip(prose, line_hashes)
+                  if fingerprint in self.lines}
+        for i, fingerprint in enumerate(block_fingerprints(line_hashes)):
+            if fingerprint in self.blocks:
+                remove.update(index for index, _ in prose[i:i + BLOCK_LINES])
+        if not remove:
+            return text
+        return "\n".join(line for index, line in enumerate(text.splitlines()) if index not in remove)
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+def strip_boilerplate(output_dir, state_file=STATE_FILE, store_file=None):
+    """Aprende el boilerplate de las páginas guardadas y lo quita de todas ellas
+
+    Las páginas se leen del directorio o, si se indica, del almacén en un único
+    fichero. Se recorren dos veces (contar y reescribir) para no tener el corpus
+    entero en memoria. Devuelve (huellas nuevas, páginas modificadas, bytes antes,
+    bytes después).
+    """
+    output = open_output(output_dir, store_file)
+    model = BoilerplateModel(state_file)
+    try:
+        filenames = output.filenames()
+        learned = model.learn(output.read(filename) for filename in filenames)
+
+        changed = 0
+        size_before = size_after = 0
+        for filename in filenames:
+            text = output.read(filename)
+            stripped = model.strip(text)
+            size_before += len(text.encode("utf-8"))
+            size_after += len(stripped.encode("utf-8"))
+            if stripped != text:
+                output.write(filename, stripped)
+                changed += 1
+    finally:
+        model.close()
+        output.close()
+    return learned, changed, size_before, size_after
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Quita el texto repetido en todas las páginas (menús, pies, selectores de versión)"
+    )
+    parser.add_argument("--output", default="adk_docs_txt", help="Directorio con los .txt")
+    parser.add_argument("--store", metavar="FICHERO",
+                        help="Almacén de páginas en un único fichero, en lugar del directorio")
+    parser.add_argument("--state-file", default=STATE_FILE,
+                        help="Base de datos donde se guardan las huellas aprendidas")
+    args = parser.parse_args()
+
+    learned, changed, size_before, size_after = strip_boilerplate(
+        args.output, args.state_file, args.store
+    )
+    print(f"🧹 {learned} huellas nuevas, {changed} ficheros limpiados: "
+          f"{size_before:,} → {size_after:,} bytes")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+import sqlite3
+import time
+
+# Espera máxima por el bloqueo de escritura cuando varios procesos comparten la base de datos
+BUSY_TIMEOUT = 30
+
+STATE_FILE = "crawl_state.db"
+
+class CrawlState:
+    """Estado persistente del recorrido (frontera, visitadas y estado por URL) en SQLite"""
+
+    def __init__(self, path=STATE_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT)
+        # WAL permite confirmar cada cambio sin reescribir la base de datos entera
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                depth INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                updated_at REAL NOT NULL
+            )
+        """)
+        # Reparto entre workers (shared_frontier): partición de la URL y quién la tiene cogida;
+        # prioridad en la frontera, si la URL pendiente solo está en disco (frontera desbordada)
+        # y la fecha de modificación que publica el sitemap
+        for column in ("shard INTEGER", "worker TEXT", "lease_until REAL", "priority REAL DEFAULT 0",
+                       "spilled INTEGER DEFAULT 0", "lastmod TEXT"):
+            try:
+                self.conn.execute(f"ALTER TABLE urls ADD COLUMN {column}")
+            except sqlite3.OperationalError:
+                pass
+        self.conn.execute("CREATE INDEX IF NOT EXISTS urls_status_priority ON urls (status, priority)")
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS urls_spilled_priority ON urls (priority) WHERE spilled = 1"
+        )
+        # Nombre de fichero asignado a cada URL; se conserva entre ejecuciones para
+        # que una colisión se resuelva siempre igual
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS filenames (
+                filename TEXT PRIMARY KEY,
+                url TEXT NOT NULL
+            )
+        """)
+        # Estado del recorrido compartido (fase, criterio de reparto, fracción por host) y
+        # latido de cada worker
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS crawl_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS crawl_workers (
+                worker TEXT PRIMARY KEY,
+                heartbeat REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def reset(self):
+        """Olvida el recorrido anterior para empezar desde cero"""
+        self.conn.execute("DELETE FROM urls")
+        self.conn.commit()
+
+    def add(self, url, depth, shard=None, priority=0.0, spilled=False):
+        """Registra una URL descubierta como pendiente; devuelve False si ya estaba
+
+        Con `spilled` la URL solo queda en disco hasta que la frontera la recargue (unspill).
+        """
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO urls (url, depth, status, updated_at, shard, priority, spilled) "
+            "VALUES (?, ?, 'pending', ?, ?, ?, ?)",
+            (url, depth, time.time(), shard, priority, int(spilled)),
+        )
+        self.conn.commit()
+        return cursor.rowcount == 1
+
+    def mark(self, url, status):
+        """Actualiza el estado de una URL ('done' o 'error') y libera su préstamo"""
+        self.conn.execute(
+            "UPDATE urls SET status = ?, updated_at = ?, worker = NULL, lease_until = NULL WHERE url = ?",
+            (status, time.time(), url),
+        )
+        self.conn.commit()
+
+    def set_lastmod(self, url, lastmod):
+        """Guarda el lastmod del sitemap de una URL ya registrada"""
+        self.conn.execute("UPDATE urls SET lastmod = ? WHERE url = ?", (lastmod, url))
+        self.conn.commit()
+
+    def lastmod(self, url):
+        row = self.conn.execute("SELECT lastmod FROM urls WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def claim_filename(self, url, filename):
+        """Reserva el nombre de fichero para la URL; devuelve False si ya pertenece a otra"""
+        self.conn.execute(
+            "INSERT OR IGNORE INTO filenames (filename, url) VALUES (?, ?)", (filename, url)
+        )
+        self.conn.commit()
+        owner = self.conn.execute(
+            "SELECT url FROM filenames WHERE filename = ?", (filename,)
+        ).fetchone()[0]
+        return owner == url
+
+    def filenames(self):
+        """Nombre de fichero asignado a cada URL, {url: filename}"""
+        return {url: filename for filename, url in self.conn.execute("SELECT filename, url FROM filenames")}
+
+    def requeue_failed(self):
+        """Vuelve a dejar pendientes las URLs que fallaron; devuelve cuántas"""
+        cursor = self.conn.execute(
+            "UPDATE urls SET status = 'pending', updated_at = ? WHERE status = 'error'",
+            (time.time(),),
+        )
+        self.conn.commit()
+        return cursor.rowcount
+
+    def known_urls(self):
+        """Todas las URLs registradas, procesadas o no (un iterador, sin cargarlas todas)"""
+        return (row[0] for row in self.conn.execute("SELECT url FROM urls"))
+
+    def exists(self, url):
+        """True si la URL ya está registrada"""
+        return self.conn.execute("SELECT 1 FROM urls WHERE url = ?", (url,)).fetchone() is not None
+
+    def spill_pending(self):
+        """Deja en disco todas las URLs pendientes (al reanudar); devuelve cuántas"""
+        cursor = self.conn.execute("UPDATE urls SET spilled = 1 WHERE status = 'pending'")
+        self.conn.commit()
+        return cursor.rowcount
+
+    def unspill(self, limit):
+        """Saca de disco hasta `limit` URLs pendientes, las de mejor prioridad primero
+
+        Devuelve [(url, profundidad)]; dejan de contar como desbordadas.
+        """
+        rows = self.conn.execute(
+            "SELECT rowid, url, depth FROM urls WHERE spilled = 1 AND status = 'pending' "
+            "ORDER BY priority, rowid LIMIT ?",
+            (limit,),
+        ).fetchall()
+        self.conn.executemany("UPDATE urls SET spilled = 0 WHERE rowid = ?",
+                              [(rowid,) for rowid, _, _ in rows])
+        self.conn.commit()
+        return [(url, depth) for _, url, depth in rows]
+
+    def lease(self, worker, shards, limit, timeout):
+        """Presta al worker hasta `limit` URLs pendientes de sus particiones durante `timeout` s
+
+        Los préstamos vencidos (de un worker que murió o dejó de renovar) vuelven antes a
+        pendientes. Se prestan primero las de mejor prioridad. Todo ocurre en una
+        transacción de escritura, así que dos workers nunca reciben la misma URL.
+        Devuelve [(url, profundidad)].
+        """
+        if not shards:
+            return []
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute(
+                "UPDATE urls SET status = 'pending', worker = NULL, lease_until = NULL "
+                "WHERE status = 'leased' AND lease_until < ?",
+                (now,),
+            )
+            rows = self.conn.execute(
+                f"SELECT rowid, url, depth FROM urls WHERE status = 'pending' "
+                f"AND shard IN ({','.join('?' * len(shards))}) ORDER BY priority, rowid LIMIT ?",
+                (*shards, limit),
+            ).fetchall()
+            self.conn.executemany(
+                "UPDATE urls SET status = 'leased', worker = ?, lease_until = ?, updated_at = ? "
+                "WHERE rowid = ?",
+                [(worker, now + timeout, now, rowid) for rowid, _, _ in rows],
+            )
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+        return [(url, depth) for _, url, depth in rows]
+
+    def renew(self, worker, timeout):
+        """Alarga los préstamos del worker; si no lo hace a tiempo, otro se quedará sus URLs"""
+        self.conn.execute(
+            "UPDATE urls SET lease_until = ? WHERE worker = ? AND status = 'leased'",
+            (time.time() + timeout, worker),
+        )
+        self.conn.execute(
+            "INSERT OR REPLACE INTO crawl_workers (worker, heartbeat) VALUES (?, ?)",
+            (worker, time.time()),
+        )
+        self.conn.commit()
+
+    def live_workers(self, timeout):
+        """Workers con un latido en los últimos `timeout` segundos, ordenados"""
+        return [row[0] for row in self.conn.execute(
+            "SELECT worker FROM crawl_workers WHERE heartbeat >= ? ORDER BY worker",
+            (time.time() - timeout,),
+        )]
+
+    def retire(self, worker):
+        """Da de baja al worker y devuelve a pendientes las URLs que tuviera prestadas"""
+        self.conn.execute(
+            "UPDATE urls SET status = 'pending', worker = NULL, lease_until = NULL "
+            "WHERE worker = ? AND status = 'leased'",
+            (worker,),
+        )
+        self.conn.execute("DELETE FROM crawl_workers WHERE worker = ?", (worker,))
+        self.conn.commit()
+
+    def assign_shards(self, shard_of):
+        """Calcula la partición de las URLs que aún no la tienen (registradas sin reparto)"""
+        rows = self.conn.execute("SELECT rowid, url FROM urls WHERE shard IS NULL").fetchall()
+        self.conn.executemany(
+            "UPDATE urls SET shard = ? WHERE rowid = ?", [(shard_of(url), rowid) for rowid, url in rows]
+        )
+        self.conn.commit()
+        return len(rows)
+
+    def outstanding(self):
+        """URLs que faltan por terminar entre todos los workers (pendientes o prestadas)"""
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM urls WHERE status IN ('pending', 'leased')"
+        ).fetchone()[0]
+
+    def count_urls(self):
+        return self.conn.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+
+    def get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM crawl_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO crawl_meta (key, value) VALUES (?, ?)", (key, value))
+        self.conn.commit()
+
+    def counts(self):
+        """Número de URLs por estado"""
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM urls GROUP BY status"))
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
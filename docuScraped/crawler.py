@@ -0,0 +1,990 @@
+import os
+import asyncio
+import json
+import sys
+import time
+import hashlib
+import tempfile
+import multiprocessing
+import aiohttp
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlparse
+from frontier import Frontier, Priorities, MAX_DEPTH, MAX_PAGES, FRONTIER_MEMORY
+from shared_frontier import SharedFrontier, SHARD_BY, POLL_INTERVAL, new_worker_id
+from checkpoint import CrawlState, STATE_FILE
+from http_cache import HttpCache, content_hash
+from extraction import parse_page, resolve_profile, StreamingExtractor
+from http_client import ConnectionStats, create_session
+from rate_limiter import HostRateLimiter, INITIAL_RATE, MIN_RATE, MAX_RATE, parse_retry_after
+from url_utils import canonicalize_url
+from urlset import FingerprintSet
+from sitemap import discover_sitemap_urls
+from archive import ArchiveWriter
+from boilerplate import strip_boilerplate
+from store import open_output
+from scope import Scope, OutOfScopeError, TooLargeError, DEFAULT_CONTENT_TYPES, MAX_BYTES
+from schedule import RecrawlSchedule, MIN_INTERVAL, format_interval
+from metrics import CrawlMetrics, PROGRESS_INTERVAL, phase_trace_config
+from resilience import CircuitBreaker, CircuitOpenError, MAX_RETRIES, backoff_delay, is_retryable
+
+# Límites del motor de descarga concurrente
+MAX_CONCURRENCY = 8    # Peticiones simultáneas en total
+MAX_PER_HOST = 4       # Peticiones simultáneas contra un mismo host
+REQUEST_TIMEOUT = 30
+
+# Las páginas mayores que este tamaño (según el Content-Length o, si falta, al leerlas)
+# se procesan en streaming. El streaming no construye el árbol, así que esas páginas no
+# usan el perfil de extracción y se guardan como texto plano de toda la página.
+STREAM_THRESHOLD = 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+# Etapa de análisis: procesos que extraen el texto y tamaño de las colas entre etapas.
+# Las colas acotadas frenan la descarga si el análisis no da abasto.
+PARSE_WORKERS = os.cpu_count() or 1
+PIPELINE_QUEUE_SIZE = 16
+
+# En modo vigilancia, espera mínima entre dos pasadas aunque ya haya páginas pendientes
+WATCH_MIN_SLEEP = 60
+
+class HostSemaphores:
+    """Un semáforo por host para respetar el límite de cortesía"""
+
+    def __init__(self, max_per_host=MAX_PER_HOST):
+        self.max_per_host = max_per_host
+        self.semaphores = {}
+
+    def get(self, url):
+        """Devuelve el semáforo que limita la concurrencia contra el host de la URL"""
+        host = urlparse(url).netloc
+        if host not in self.semaphores:
+            self.semaphores[host] = asyncio.Semaphore(self.max_per_host)
+        return self.semaphores[host]
+
+# Respuesta descargada: estado HTTP, cabeceras, cuerpo en bytes y codificación.
+# Si la página se procesó en streaming, el cuerpo es None y el resultado está en el sink.
+Response = namedtuple("Response", ["status", "headers", "body", "encoding"])
+
+# Página descargada que pasa a la etapa de análisis
+ParseJob = namedtuple("ParseJob", [
+    "url", "depth", "filename", "body", "encoding", "headers", "body_hash", "lastmod",
+])
+
+class SiteConfig:
+    """Configuración de un sitio a recorrer: URL base, semillas, límites y ficheros de salida
+
+    Cada sitio tiene su propio directorio de salida y su propia base de datos de
+    estado, que por defecto se guarda dentro del directorio de salida.
+    """
+
+    def __init__(self, base_url, output_dir, seed_urls=(), name=None, allowed_prefix=None,
+                 state_file=None, archive_file=None, report_file=None, store_file=None,
+                 max_depth=MAX_DEPTH, max_pages=MAX_PAGES, use_sitemap=True,
+                 strip_boilerplate=True, profile=None, include=None, exclude=None,
+                 content_types=DEFAULT_CONTENT_TYPES, max_bytes=MAX_BYTES, sections=None, quotas=None):
+        self.base_url = base_url
+        self.output_dir = output_dir
+        self.seed_urls = list(seed_urls)
+        self.name = name or urlparse(base_url).netloc + urlparse(base_url).path.rstrip("/")
+        self.allowed_prefix = allowed_prefix or base_url
+        # Alcance: por defecto todo lo que cuelga del prefijo salvo recursos estáticos.
+        # Las reglas son "prefix:", "glob:" o "re:" (ver scope.rule_pattern).
+        self.scope = Scope(include or [self.allowed_prefix], exclude, content_types, max_bytes)
+        # Prioridad de la frontera: {regla: importancia} por sección y {regla: máximo} de URLs
+        self.sections = dict(sections or {})
+        self.quotas = dict(quotas or {})
+        self.state_file = state_file or os.path.join(output_dir, STATE_FILE)
+        self.archive_file = archive_file
+        self.report_file = report_file
+        # Con un almacén (PageStore) las páginas van a un único fichero y no al directorio
+        self.store_file = store_file
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.use_sitemap = use_sitemap
+        self.strip_boilerplate = strip_boilerplate
+        # Perfil de extracción (nombre de PROFILES o {content, drop}); sin él, la página entera
+        self.profile = resolve_profile(profile)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+def load_site_configs(path):
+    """Lee uno o varios sitios de un fichero JSON (un objeto o una lista de objetos)"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = [data]
+    return [SiteConfig.from_dict(entry) for entry in data]
+
+class PageStream:
+    """Destino de una descarga en streaming: hash incremental y texto escrito mientras llega"""
+
+    def __init__(self, url, tmp_path, keep_raw=False):
+        self.url = url
+        self.tmp_path = tmp_path
+        self.keep_raw = keep_raw
+        # Copia del cuerpo en bruto (en un temporal, no en memoria) para el archivo WARC
+        self.raw = None
+        self.links = []
+        self.content_hash = None
+        self._file = None
+
+    def open(self, encoding):
+        self._hash = hashlib.sha256()
+        self._file = open(self.tmp_path, "w", encoding="utf-8")
+        self._extractor = StreamingExtractor(self._file, self.url, encoding)
+        if self.keep_raw:
+            self.raw = tempfile.TemporaryFile()
+
+    def feed(self, chunk):
+        self._hash.update(chunk)
+        self._extractor.feed(chunk)
+        if self.raw is not None:
+            self.raw.write(chunk)
+
+    def close(self):
+        self.links = self._extractor.finish()
+        self._file.close()
+        self.content_hash = self._hash.hexdigest()
+
+    def discard(self):
+        if self._file is not None:
+            self._file.close()
+            if os.path.exists(self.tmp_path):
+                os.remove(self.tmp_path)
+        self.release_raw()
+
+    def release_raw(self):
+        if self.raw is not None:
+            self.raw.close()
+            self.raw = None
+
+async def read_upto(response, limit):
+    """Lee el cuerpo hasta pasar de `limit` bytes; devuelve (trozos leídos, True si está entero)"""
+    chunks = []
+    size = 0
+    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+        chunks.append(chunk)
+        size += len(chunk)
+        if limit is not None and size > limit:
+            return chunks, False
+    return chunks, True
+
+async def body_chunks(response, head=()):
+    """Trozos del cuerpo: primero los ya leídos y después el resto de la respuesta"""
+    for chunk in head:
+        yield chunk
+    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+        yield chunk
+
+def get_filename_from_url(url, base_url):
+    """Genera un nombre de archivo limpio basado en la URL"""
+    path = urlparse(url).path.strip('/')
+    # La página principal se guarda siempre como index.txt
+    if not path or url == canonicalize_url(base_url):
+        return "index.txt"
+
+    # Reemplazar caracteres especiales y crear nombre de archivo
+    filename = path.replace('/', '_').replace('-', '_')
+    if not filename.endswith('.txt'):
+        filename += '.txt'
+
+    return filename
+
+class Crawler:
+    """Recorre un sitio en anchura con un número limitado de peticiones en paralelo
+
+    Funciona como un pipeline de tres etapas unidas por colas acotadas: descarga
+    (asyncio), análisis (un pool de procesos) y escritura. La sesión HTTP y el pool
+    de procesos se reciben de fuera para que varios sitios los compartan, igual que
+    los semáforos por host, el ritmo y el cortacircuitos (si no, el sitio tiene los suyos).
+    """
+
+    def __init__(self, config, session, pool, max_concurrency=MAX_CONCURRENCY,
+                 max_per_host=MAX_PER_HOST, parse_workers=PARSE_WORKERS, refresh=False,
+                 stream_threshold=STREAM_THRESHOLD, progress=False, connection_stats=None,
+                 use_schedule=True, frontier_memory=FRONTIER_MEMORY, bloom=False, worker=None,
+                 coordinator=True, shard_by=SHARD_BY, time_budget=None, page_budget=None,
+                 host_semaphores=None, rate_limiter=None, circuit_breaker=None):
+        self.config = config
+        self.session = session
+        self.pool = pool
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        # Cortesía por host: concurrencia, ritmo ajustado según la latencia y los 429/503,
+        # y pausa de los hosts que no responden
+        self.host_semaphores = HostSemaphores(max_per_host) if host_semaphores is None else host_semaphores
+        self.rate_limiter = HostRateLimiter() if rate_limiter is None else rate_limiter
+        self.circuit_breaker = CircuitBreaker() if circuit_breaker is None else circuit_breaker
+        self.parse_workers = parse_workers
+        self.refresh = refresh
+        self.stream_threshold = stream_threshold
+        self.progress = progress
+        self.connection_stats = connection_stats
+        # Con el calendario, las páginas guardadas solo se revisan cuando les toca
+        self.use_schedule = use_schedule
+        # URLs pendientes en memoria antes de desbordar la frontera a disco
+        self.frontier_memory = frontier_memory
+        self.bloom = bloom
+        # Con un id de worker la frontera es compartida (SharedFrontier). El coordinador la
+        # siembra y al final quita el boilerplate y escribe el informe; el resto se une.
+        self.worker = worker
+        self.coordinator = coordinator
+        self.shard_by = shard_by
+        # Presupuestos de la ejecución (segundos y URLs): al agotarse se terminan las páginas
+        # en curso y el resto queda pendiente para --resume, con lo más valioso ya hecho
+        self.time_budget = time_budget
+        self.page_budget = page_budget
+        self.started = None
+        self.pages_taken = 0
+        self.active_downloads = 0
+        self.budget_stop = None
+
+        # Tiempos por fase, bytes, estados y colas de este sitio
+        self.metrics = CrawlMetrics(per_url=bool(config.report_file) and coordinator)
+        # Páginas guardadas en esta ejecución, como huellas de 64 bits
+        self.visited_urls = FingerprintSet()
+        # Hash de las páginas descargadas que aún no han llegado a la caché, para
+        # detectar duplicados que están a la vez en el pipeline
+        self.in_flight_hashes = {}
+        # Páginas que no se pidieron porque aún no les tocaba revisión
+        self.schedule_skips = 0
+
+        self.state = None
+        self.cache = None
+        self.frontier = None
+        self.archive = None
+        self.schedule = None
+
+    async def fetch_once(self, url, headers, sink, stream_threshold, scope=None):
+        """Un único intento de descarga; los errores se propagan como excepciones
+
+        Con `scope`, una respuesta de un tipo de contenido no permitido se corta
+        tras las cabeceras con OutOfScopeError, sin descargar el cuerpo, y una que
+        supera su tamaño máximo con TooLargeError: antes de leer el cuerpo si lo
+        anuncia el Content-Length y, si no, en cuanto se pasa al leerlo.
+        """
+        async with self.host_semaphores.get(url):
+            # El circuito se comprueba antes y después de esperar turno, porque pudo abrirse mientras
+            if self.circuit_breaker.blocked(url):
+                raise CircuitOpenError(urlparse(url).netloc)
+
+            # Esperar turno en el cubo de tokens del host para no sobrecargar el servidor
+            await self.rate_limiter.acquire(url)
+
+            if not self.circuit_breaker.allow(url):
+                raise CircuitOpenError(urlparse(url).netloc)
+
+            print(f"Descargando: {url}")
+            started = time.monotonic()
+            try:
+                async with self.session.get(url, headers=headers,
+                                            trace_request_ctx=(self.metrics, url)) as response:
+                    # Con las cabeceras recibidas: tiempo hasta el primer byte
+                    headers_at = time.monotonic()
+                    self.metrics.record_phase(url, "ttfb", headers_at - started)
+                    self.rate_limiter.record(
+                        url,
+                        response.status,
+                        time.monotonic() - started,
+                        parse_retry_after(response.headers.get("Retry-After")),
+                    )
+                    response.raise_for_status()
+                    if response.status == 304:
+                        self.metrics.record_response(url, 304, 0)
+                        return Response(304, response.headers, b"", None)
+                    content_type = response.headers.get("Content-Type")
+                    if scope is not None and not scope.allows_type(content_type):
+                        self.metrics.record_response(url, response.status, 0)
+                        raise OutOfScopeError(content_type)
+
+                    length = response.content_length
+                    max_bytes = scope.max_bytes if scope is not None else None
+                    if scope is not None and not scope.allows_size(length):
+                        self.metrics.record_response(url, response.status, 0)
+                        raise TooLargeError(max_bytes)
+                    # Las páginas pequeñas se leen en memoria y van al pool de análisis con su
+                    # perfil. Sin Content-Length (lo habitual con gzip por trozos) se lee hasta
+                    # stream_threshold y solo se pasa a streaming si el cuerpo lo supera.
+                    head, complete = [], False
+                    if sink is None or (length is not None and length <= stream_threshold):
+                        head, complete = await read_upto(response, max_bytes)
+                        if not complete:
+                            # El Content-Length no cuenta la descompresión
+                            self.metrics.record_response(url, response.status, max_bytes)
+                            raise TooLargeError(max_bytes)
+                    elif length is None and stream_threshold > 0:
+                        # Sin pasar del máximo: si el cuerpo lo supera, el streaming lo corta
+                        limit = stream_threshold if max_bytes is None else min(stream_threshold, max_bytes)
+                        head, complete = await read_upto(response, limit)
+
+                    if not complete:
+                        # Sin decodificar a str: lxml recibe los bytes y la codificación declarada
+                        sink.open(response.charset)
+                        size = 0
+                        async for chunk in body_chunks(response, head):
+                            size += len(chunk)
+                            if max_bytes is not None and size > max_bytes:
+                                # Sale del bloque sin leer el resto: la conexión se cierra
+                                self.metrics.record_response(url, response.status, size)
+                                raise TooLargeError(max_bytes)
+                            sink.feed(chunk)
+                        sink.close()
+                        # En streaming la descarga incluye el análisis, que va a la par
+                        self.metrics.record_phase(url, "download", time.monotonic() - headers_at)
+                        self.metrics.record_response(url, response.status, size)
+                        return Response(response.status, response.headers, None, response.charset)
+
+                    body = b"".join(head)
+                    self.metrics.record_phase(url, "download", time.monotonic() - headers_at)
+                    self.metrics.record_response(url, response.status, len(body))
+                    # Como en streaming, sin charset en las cabeceras lo deduce el análisis
+                    return Response(response.status, response.headers, body, response.charset)
+            except aiohttp.ClientResponseError as e:
+                self.metrics.record_response(url, e.status)
+                raise
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                # Sin respuesta del servidor: también es señal de sobrecarga
+                self.rate_limiter.record(url, None, time.monotonic() - started)
+                raise
+
+    async def get_page(self, url, headers=None, sink=None, stream_threshold=None,
+                       max_retries=MAX_RETRIES, scope=None):
+        """Descarga la URL con reintentos; devuelve None si no se pudo
+
+        Un 304 devuelve una respuesta con el cuerpo vacío. Si se pasa un sink
+        (PageStream) y la página supera stream_threshold (anunciado o al leerla), el
+        cuerpo se le entrega por trozos en lugar de acumularse en memoria.
+        OutOfScopeError se propaga.
+        """
+        if stream_threshold is None:
+            stream_threshold = self.stream_threshold
+
+        for attempt in range(max_retries + 1):
+            try:
+                response = await self.fetch_once(url, headers, sink, stream_threshold, scope)
+            except OutOfScopeError:
+                self.circuit_breaker.record_success(url)
+                raise
+            except CircuitOpenError:
+                print(f"⛔ Host en pausa, se omite: {url}")
+                return None
+            except Exception as e:
+                if sink is not None:
+                    sink.discard()
+                if not is_retryable(e):
+                    # El host respondió (por ejemplo con un 404): el circuito no tiene nada que ver
+                    self.circuit_breaker.record_success(url)
+                    print(f"❌ Error al descargar {url}: {e}")
+                    return None
+
+                self.circuit_breaker.record_failure(url)
+                if attempt == max_retries:
+                    print(f"❌ Error al descargar {url} tras {max_retries + 1} intentos: {e}")
+                    return None
+
+                # La espera se hace fuera del hueco del host para no bloquear otras descargas
+                delay = backoff_delay(attempt)
+                self.metrics.record_retry(url)
+                print(f"🔁 Reintento {attempt + 1}/{max_retries} de {url} en {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+            else:
+                self.circuit_breaker.record_success(url)
+                return response
+
+    def save_text(self, text, filename, url):
+        self.output.write(filename, text, url)
+
+        print(f"✅ Guardado: {filename}")
+
+    def filter_site_links(self, links):
+        """Solo incluir enlaces del mismo dominio"""
+        netloc = urlparse(self.config.base_url).netloc
+        return [link for link in links if urlparse(link).netloc == netloc]
+
+    def output_filename(self, url):
+        """Nombre de fichero de la URL, desambiguado si otra URL ya produce el mismo"""
+        filename = get_filename_from_url(url, self.config.base_url)
+        if self.state.claim_filename(url, filename):
+            return filename
+
+        # Por ejemplo a/b_c y a_b/c: se añade un sufijo estable derivado de la URL
+        suffix = hashlib.sha1(url.encode("utf-8")).hexdigest()[:8]
+        alternative = f"{filename[:-len('.txt')]}_{suffix}.txt"
+        print(f"⚠️  Colisión de nombre: {url} también genera {filename}, se guarda como {alternative}")
+        self.state.claim_filename(url, alternative)
+        return alternative
+
+    async def process_page(self, url, lastmod=None):
+        """Descarga o revalida una página
+
+        Devuelve sus enlaces si ya está resuelta, None si falló, o un ParseJob si hay
+        que extraer el texto. `lastmod` es la fecha de modificación que publica el
+        sitemap, si la hay. Con un archivo abierto se guarda además la respuesta en bruto.
+        """
+        cache = self.cache
+        archive = self.archive
+        filename = self.output_filename(url)
+        sink = PageStream(url, self.output.staging_path(filename), keep_raw=archive is not None)
+
+        # Solo se revalida si el texto de la ejecución anterior sigue guardado
+        cached = None
+        if not self.refresh and self.output.exists(filename):
+            cached = cache.get(url)
+
+        if cached and lastmod and cached["lastmod"] == lastmod:
+            # El sitemap dice que no ha cambiado desde el último recorrido: ni siquiera se revalida
+            print(f"🗺️  Sin cambios según el sitemap: {filename}")
+            # Cuenta como revisión sin cambios: así su próxima fecha avanza
+            self.schedule.observe(url, cached["content_hash"])
+            return cached["links"]
+
+        if cached and not lastmod and self.use_schedule and not self.schedule.due(url):
+            # Según su historial de cambios aún no toca revisarla: ni siquiera se revalida.
+            # Un lastmod distinto en el sitemap sí fuerza la descarga.
+            self.schedule_skips += 1
+            return cached["links"]
+
+        try:
+            response = await self.get_page(url, HttpCache.conditional_headers(cached), sink,
+                                           scope=self.config.scope)
+        except OutOfScopeError as e:
+            # Por ejemplo un PDF o una imagen sin extensión reconocible en la URL
+            print(f"🚫 Fuera de alcance ({e}): {url}")
+            sink.discard()
+            return []
+        if response is None:
+            return None
+
+        if response.status == 304 and cached:
+            print(f"♻️  Sin cambios (304): {filename}")
+            # Se guarda el lastmod nuevo (si no, la próxima vez tampoco coincidiría) y los
+            # validadores que el servidor pueda haber renovado
+            cache.store(
+                url,
+                response.headers.get("ETag") or cached["etag"],
+                response.headers.get("Last-Modified") or cached["last_modified"],
+                cached["content_hash"],
+                cached["links"],
+                lastmod or cached["lastmod"],
+            )
+            self.schedule.observe(url, cached["content_hash"])
+            return cached["links"]
+
+        # En streaming el texto ya está en el fichero temporal y el hash en el sink
+        streamed = response.body is None
+        body_hash = sink.content_hash if streamed else content_hash(response.body)
+
+        unchanged = cached is not None and cached["content_hash"] == body_hash
+        if not unchanged:
+            duplicate_of = self.in_flight_hashes.get(body_hash) or cache.find_duplicate(url, body_hash)
+            if duplicate_of:
+                # El mismo contenido ya está guardado con otra URL
+                print(f"🔁 Duplicado de {duplicate_of}: {url}")
+                sink.discard()
+                return []
+
+        if archive is not None and (not unchanged or url not in archive.urls):
+            archive.write_response(
+                url, response.status, response.headers, sink.raw if streamed else response.body
+            )
+        sink.release_raw()
+
+        if unchanged:
+            # El servidor no revalida, pero el contenido es idéntico: no se analiza ni se escribe
+            print(f"♻️  Sin cambios: {filename}")
+            sink.discard()
+            links = cached["links"]
+        elif streamed:
+            # Sustituye la página guardada por el texto recién extraído
+            self.output.commit_file(filename, sink.tmp_path, url)
+            print(f"✅ Guardado (streaming): {filename}")
+            links = self.filter_site_links(sink.links)
+        else:
+            # El análisis (CPU) se hace en la etapa de procesos; la caché y el calendario
+            # se actualizan al escribir
+            self.in_flight_hashes[body_hash] = url
+            return ParseJob(url, None, filename, response.body, response.encoding,
+                            response.headers, body_hash, lastmod)
+
+        cache.store(
+            url,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+            body_hash,
+            links,
+            lastmod,
+        )
+        self.schedule.observe(url, body_hash)
+        return links
+
+    def finish_page(self, url, depth, links):
+        """Registra el resultado de una página y encola sus enlaces"""
+        if links is not None:
+            self.visited_urls.add(url)
+
+            # Los enlaces de cualquier página alimentan la frontera
+            for link in links:
+                self.frontier.add(link, depth + 1)
+
+        # Se marca después de guardar: si el proceso muere antes, la URL sigue pendiente
+        outcome = "done" if links is not None else "error"
+        self.state.mark(url, outcome)
+        if links is None:
+            self.schedule.fail(url)
+        self.metrics.record_outcome(url, outcome)
+
+    def over_budget(self):
+        """True si ya no se deben empezar más páginas por el presupuesto de tiempo o de páginas"""
+        if self.budget_stop.is_set():
+            return True
+        if self.page_budget is not None and self.pages_taken >= self.page_budget:
+            return True
+        return self.time_budget is not None and time.monotonic() - self.started >= self.time_budget
+
+    async def download_worker(self, parse_queue):
+        """Etapa de descarga: consume URLs de la frontera y pasa las páginas nuevas al análisis"""
+        while True:
+            if self.over_budget():
+                self.budget_stop.set()
+                return
+            url, depth = await self.frontier.get()
+            if self.over_budget():
+                # Se agotó mientras esperaba: la URL sigue pendiente en el estado
+                self.frontier.task_done()
+                self.budget_stop.set()
+                return
+            self.pages_taken += 1
+            self.active_downloads += 1
+            handed_off = False
+            try:
+                result = await self.process_page(url, self.state.lastmod(url))
+                if isinstance(result, ParseJob):
+                    # Si la cola está llena, la descarga espera: así la memoria no crece sin límite
+                    await parse_queue.put(result._replace(depth=depth))
+                    handed_off = True
+                else:
+                    self.finish_page(url, depth, result)
+            except Exception as e:
+                # Un error inesperado no debe matar la etapa: la URL queda como fallida
+                print(f"❌ Error al procesar {url}: {e}")
+                self.finish_page(url, depth, None)
+            finally:
+                # Las páginas entregadas al análisis las da por terminadas la etapa de escritura
+                self.active_downloads -= 1
+                if not handed_off:
+                    self.frontier.task_done()
+
+    async def parse_worker(self, parse_queue, write_queue):
+        """Etapa de análisis: extrae texto y enlaces en un proceso aparte"""
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await parse_queue.get()
+            started = time.monotonic()
+            try:
+                text, links = await loop.run_in_executor(
+                    self.pool, parse_page, job.body, job.url, job.encoding, self.config.profile
+                )
+                self.metrics.record_phase(job.url, "parse", time.monotonic() - started)
+            except Exception as e:
+                print(f"❌ Error al analizar {job.url}: {e}")
+                text, links = None, None
+            await write_queue.put((job, text, links))
+            parse_queue.task_done()
+
+    async def write_worker(self, write_queue):
+        """Etapa de escritura: guarda el texto, actualiza la caché y encola los enlaces"""
+        while True:
+            job, text, links = await write_queue.get()
+            try:
+                if text is not None:
+                    started = time.monotonic()
+                    self.save_text(text, job.filename, job.url)
+                    links = self.filter_site_links(links)
+                    self.cache.store(
+                        job.url,
+                        job.headers.get("ETag"),
+                        job.headers.get("Last-Modified"),
+                        job.body_hash,
+                        links,
+                        job.lastmod,
+                    )
+                    self.schedule.observe(job.url, job.body_hash)
+                    self.metrics.record_phase(job.url, "write", time.monotonic() - started)
+                self.in_flight_hashes.pop(job.body_hash, None)
+                self.finish_page(job.url, job.depth, links)
+            except Exception as e:
+                # Solo hay un escritor: si muriera, las colas se llenarían y el recorrido no acabaría
+                print(f"❌ Error al guardar {job.url}: {e}")
+                self.in_flight_hashes.pop(job.body_hash, None)
+                self.finish_page(job.url, job.depth, None)
+            finally:
+                write_queue.task_done()
+                self.frontier.task_done()
+
+    async def monitor(self, parse_queue, write_queue):
+        """Muestrea la profundidad de las colas y, si se pide, muestra una línea de progreso"""
+        while True:
+            await asyncio.sleep(PROGRESS_INTERVAL)
+            depths = {
+                "frontier": self.frontier.qsize(),
+                "parse": parse_queue.qsize(),
+                "write": write_queue.qsize(),
+            }
+            self.metrics.sample_queues(**depths)
+            if self.over_budget():
+                # El tiempo también se agota con todas las descargas esperando
+                self.budget_stop.set()
+            if self.progress:
+                # Se reescribe la misma línea en un terminal; si no, una línea por muestra
+                end = "" if sys.stdout.isatty() else "\n"
+                line = self.metrics.progress_line(**depths)
+                print(f"\r[{self.config.name}] {line}", end=end, flush=True)
+
+    async def discover_sitemap(self):
+        """Siembra la frontera con las páginas que publica el sitemap del sitio"""
+        def add_url(url, lastmod):
+            # Cada página se encola según llega; su lastmod se guarda en el estado, no en memoria
+            url = canonicalize_url(url)
+            self.frontier.add(url, 1)
+            if lastmod:
+                self.state.set_lastmod(url, lastmod)
+
+        count = await discover_sitemap_urls(
+            lambda url, sink: self.get_page(url, sink=sink, stream_threshold=0),
+            self.config.base_url,
+            add_url,
+        )
+        print(f"🗺️  Sitemap: {count} URLs")
+
+    async def run(self, resume=False, retry_failed=False):
+        """Recorre el sitio y devuelve las páginas guardadas (un FingerprintSet)"""
+        config = self.config
+        self.started = time.monotonic()
+        self.budget_stop = asyncio.Event()
+        priorities = Priorities(config.sections, config.quotas)
+        # El directorio de salida lo crea DirectoryStore; aquí solo el del estado
+        os.makedirs(os.path.dirname(os.path.abspath(config.state_file)), exist_ok=True)
+
+        # La frontera deduplica y aplica los límites de profundidad, páginas y prefijo;
+        # cada URL descubierta y su estado se guardan en disco para poder reanudar
+        self.state = CrawlState(config.state_file)
+        # La caché HTTP sobrevive entre ejecuciones para hacer recorridos incrementales
+        self.cache = HttpCache(config.state_file)
+        # Historial de cambios por página y fecha de su próxima revisión
+        self.schedule = RecrawlSchedule(config.state_file)
+        # Archivo opcional de respuestas en bruto para re-extraer sin red
+        self.archive = ArchiveWriter(config.archive_file) if config.archive_file else None
+        # Directorio con un .txt por página o almacén en un único fichero
+        self.output = open_output(config.output_dir, config.store_file)
+
+        try:
+            if self.worker is not None and not self.coordinator:
+                # Worker que se une a un recorrido compartido: la frontera ya la sembró el coordinador
+                await self.wait_for_coordinator()
+                self.frontier = SharedFrontier(
+                    config.scope, config.max_depth, config.max_pages, self.state, self.bloom,
+                    self.worker, self.state.get_meta("shard_by", SHARD_BY), priorities=priorities,
+                )
+            else:
+                if self.worker is not None:
+                    self.state.set_meta("phase", "seeding")
+                    self.state.set_meta("shard_by", self.shard_by)
+                    self.frontier = SharedFrontier(
+                        config.scope, config.max_depth, config.max_pages, self.state, self.bloom,
+                        self.worker, self.shard_by, priorities=priorities,
+                    )
+                else:
+                    self.frontier = Frontier(config.scope, config.max_depth, config.max_pages,
+                                             self.state, self.frontier_memory, self.bloom, priorities)
+
+                if retry_failed:
+                    # Las URLs que fallaron en la ejecución anterior vuelven a la frontera
+                    print(f"🔁 Reintentando {self.state.requeue_failed()} URLs fallidas")
+
+                if resume or retry_failed:
+                    restored = self.frontier.restore()
+                    print(f"♻️  Reanudando: {restored} URLs pendientes de {len(self.frontier)} conocidas")
+                else:
+                    self.state.reset()
+                    self.frontier.add(config.base_url, 0)
+                    for url in config.seed_urls:
+                        self.frontier.add(url, 1)
+
+                if config.use_sitemap and not (resume or retry_failed):
+                    # Una sola petición descubre todas las páginas que publica el sitio
+                    await self.discover_sitemap()
+
+                if self.worker is not None:
+                    # A partir de aquí los demás workers pueden empezar a tomar URLs
+                    self.state.set_meta("phase", "running")
+
+            parse_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+            write_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+
+            workers = [
+                asyncio.create_task(self.download_worker(parse_queue))
+                for _ in range(self.max_concurrency)
+            ]
+            workers += [
+                asyncio.create_task(self.parse_worker(parse_queue, write_queue))
+                for _ in range(self.parse_workers)
+            ]
+            workers.append(asyncio.create_task(self.write_worker(write_queue)))
+            workers.append(asyncio.create_task(self.monitor(parse_queue, write_queue)))
+            if self.worker is not None:
+                workers.append(asyncio.create_task(self.frontier.heartbeat()))
+            finished = asyncio.create_task(self.frontier.join())
+            stopped = asyncio.create_task(self.budget_stop.wait())
+            try:
+                # Una etapa que muere también termina la espera: sin ella la frontera no se vaciaría
+                done, _ = await asyncio.wait({finished, stopped, *workers},
+                                             return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task in workers and task.exception() is not None:
+                        raise task.exception()
+                if not finished.done():
+                    await self.drain(parse_queue, write_queue)
+            finally:
+                for worker in workers + [finished, stopped]:
+                    worker.cancel()
+                await asyncio.gather(*workers, finished, stopped, return_exceptions=True)
+            if self.worker is not None and self.coordinator:
+                self.state.set_meta("phase", "finished")
+            counts = self.state.counts()
+        finally:
+            # También tras Ctrl-C o un error: lo terminado queda registrado
+            if isinstance(self.frontier, SharedFrontier):
+                # Lo que tuviera prestado este worker vuelve enseguida a los demás
+                self.frontier.retire()
+            self.state.close()
+            self.cache.close()
+            self.schedule.close()
+            if self.archive is not None:
+                self.archive.close()
+            self.output.close()
+
+        if self.progress:
+            print()
+        if config.strip_boilerplate and self.coordinator:
+            await self.remove_boilerplate()
+        print(f"📋 [{config.name}] Encontrados {len(self.frontier)} enlaces totales")
+        if self.budget_stop.is_set():
+            print(f"⏳ [{config.name}] Presupuesto agotado tras {self.pages_taken} páginas; "
+                  f"{counts.get('pending', 0)} URLs pendientes para --resume")
+        if self.schedule_skips:
+            print(f"🗓️  [{config.name}] {self.schedule_skips} páginas sin pedir: aún no les toca revisión")
+        print(f"⏱️  [{config.name}] Tiempos: {self.metrics.summary()}")
+        if config.report_file and self.coordinator:
+            self.write_report(counts)
+            print(f"📊 [{config.name}] Informe del recorrido: {config.report_file}")
+        failed = counts.get("error", 0)
+        if failed:
+            print(f"⚠️  [{config.name}] {failed} URLs fallidas; se pueden reintentar con --retry-failed")
+        return self.visited_urls
+
+    async def drain(self, parse_queue, write_queue):
+        """Presupuesto agotado: espera a que terminen las páginas ya empezadas"""
+        while self.active_downloads:
+            await asyncio.sleep(POLL_INTERVAL)
+        await parse_queue.join()
+        await write_queue.join()
+
+    async def wait_for_coordinator(self):
+        """Espera a que el coordinador termine de sembrar la frontera compartida"""
+        waiting = False
+        while self.state.get_meta("phase") != "running":
+            if not waiting:
+                print(f"⏳ [{self.config.name}] Esperando a que el coordinador siembre la frontera...")
+                waiting = True
+            await asyncio.sleep(POLL_INTERVAL)
+
+    async def remove_boilerplate(self):
+        """Quita de todas las páginas el texto que se repite en el sitio (menús, pies...)"""
+        # En el pool de análisis: es CPU y no debe parar a los demás sitios
+        learned, changed, size_before, size_after = await asyncio.get_running_loop().run_in_executor(
+            self.pool, strip_boilerplate, self.config.output_dir, self.config.state_file,
+            self.config.store_file
+        )
+        print(f"🧹 [{self.config.name}] Boilerplate: {learned} huellas nuevas, {changed} ficheros "
+              f"limpiados, {size_before:,} → {size_after:,} bytes")
+
+    def write_report(self, counts):
+        extra = {}
+        if self.connection_stats is not None:
+            # El pool es compartido: las cifras de conexiones son de todos los sitios
+            extra["connections"] = {
+                "created": self.connection_stats.created,
+                "reused": self.connection_stats.reused,
+            }
+        self.metrics.write_report(
+            self.config.report_file,
+            site={"name": self.config.name, "base_url": self.config.base_url},
+            settings={
+                "max_concurrency": self.max_concurrency,
+                "max_per_host": self.max_per_host,
+                "parse_workers": self.parse_workers,
+                "stream_threshold": self.stream_threshold,
+            },
+            host_rates=self.rate_limiter.rates(),
+            states=counts,
+            schedule={"skipped": self.schedule_skips},
+            budget={
+                "time": self.time_budget,
+                "pages": self.page_budget,
+                "exhausted": self.budget_stop.is_set(),
+                "pages_taken": self.pages_taken,
+            },
+            **extra,
+        )
+
+async def crawl_sites(configs, max_concurrency=MAX_CONCURRENCY, max_per_host=MAX_PER_HOST,
+                      parse_workers=PARSE_WORKERS, resume=False, refresh=False, retry_failed=False,
+                      stream_threshold=STREAM_THRESHOLD, progress=False, use_schedule=True,
+                      frontier_memory=FRONTIER_MEMORY, bloom=False, worker=None, coordinator=True,
+                      shard_by=SHARD_BY, time_budget=None, page_budget=None, rate_limiter=None,
+                      host_share=1.0):
+    """Recorre varios sitios a la vez con una sola sesión HTTP y un solo pool de análisis
+
+    La cortesía por host (semáforos, ritmo y cortacircuitos) se comparte entre los
+    sitios y se crea en cada llamada: sus cerrojos quedan ligados al bucle de eventos,
+    así que se puede llamar varias veces con asyncio.run en el mismo proceso. Se puede
+    pasar un HostRateLimiter propio; si no, `host_share` es la fracción de la concurrencia
+    y del ritmo por host que usa este proceso (con varios workers contra el mismo host).
+    Devuelve los Crawler ya terminados, en el mismo orden que las configuraciones.
+    """
+    output_roots = [os.path.abspath(config.store_file or config.output_dir) for config in configs]
+    state_files = [os.path.abspath(config.state_file) for config in configs]
+    if len(set(output_roots)) != len(configs) or len(set(state_files)) != len(configs):
+        raise ValueError("Cada sitio necesita su propio directorio de salida y su propio fichero de estado")
+    if worker is not None and any(config.archive_file for config in configs):
+        # El archivo WARC solo admite un escritor: los miembros gzip se intercalarían
+        raise ValueError("El archivo WARC no se puede usar en un recorrido compartido entre workers")
+
+    # Un solo pool de conexiones keep-alive para todos los sitios y workers
+    connection_stats = ConnectionStats()
+    host_semaphores = HostSemaphores(max(1, int(max_per_host * host_share)))
+    if rate_limiter is None:
+        rate_limiter = HostRateLimiter(INITIAL_RATE * host_share, MIN_RATE * host_share,
+                                       MAX_RATE * host_share)
+    circuit_breaker = CircuitBreaker()
+
+    async with create_session(max_concurrency, max_per_host, REQUEST_TIMEOUT, connection_stats,
+                              [phase_trace_config()]) as session:
+        with ProcessPoolExecutor(max_workers=parse_workers) as pool:
+            crawlers = [
+                Crawler(config, session, pool, max_concurrency, max_per_host, parse_workers,
+                        refresh, stream_threshold, progress, connection_stats, use_schedule,
+                        frontier_memory, bloom, worker, coordinator, shard_by, time_budget,
+                        page_budget, host_semaphores, rate_limiter, circuit_breaker)
+                for config in configs
+            ]
+            results = await asyncio.gather(
+                *(crawler.run(resume, retry_failed) for crawler in crawlers),
+                return_exceptions=True,
+            )
+
+    for crawler, result in zip(crawlers, results):
+        # Un sitio que falla no interrumpe a los demás
+        if isinstance(result, Exception):
+            print(f"❌ [{crawler.config.name}] Error en el recorrido: {result}")
+
+    print(f"🔌 Conexiones: {connection_stats.summary()}")
+    return crawlers
+
+def next_recrawl(configs):
+    """Fecha (epoch) en la que vence la primera revisión programada de cualquiera de los sitios"""
+    due = []
+    for config in configs:
+        if os.path.exists(config.state_file):
+            schedule = RecrawlSchedule(config.state_file)
+            due.append(schedule.next_due())
+            schedule.close()
+    due = [when for when in due if when is not None]
+    return min(due) if due else None
+
+async def watch_sites(configs, max_concurrency=MAX_CONCURRENCY, max_per_host=MAX_PER_HOST,
+                      parse_workers=PARSE_WORKERS, resume=False, refresh=False, retry_failed=False,
+                      stream_threshold=STREAM_THRESHOLD, progress=False, min_sleep=WATCH_MIN_SLEEP,
+                      frontier_memory=FRONTIER_MEMORY, bloom=False, time_budget=None,
+                      page_budget=None, use_schedule=True):
+    """Modo vigilancia: recorre los sitios, duerme hasta la próxima revisión programada y repite
+
+    Cada pasada solo pide las páginas a las que les toca según su tasa de cambio; el
+    resto se recorre con los enlaces de la caché. Sin `use_schedule` cada pasada
+    revalida todas. Los presupuestos se aplican a cada pasada. No termina nunca (se
+    para con Ctrl-C).
+    """
+    while True:
+        await crawl_sites(configs, max_concurrency, max_per_host, parse_workers, resume,
+                          refresh, retry_failed, stream_threshold, progress, use_schedule,
+                          frontier_memory, bloom, time_budget=time_budget, page_budget=page_budget)
+        # Solo la primera pasada reanuda, reintenta o ignora la caché si se pidió
+        resume = refresh = retry_failed = False
+
+        due = next_recrawl(configs)
+        delay = MIN_INTERVAL if due is None else due - time.time()
+        delay = max(min_sleep, delay)
+        print(f"💤 Próxima pasada en {format_interval(delay)}")
+        await asyncio.sleep(delay)
+
+def shared_host_share(configs):
+    """Fracción por host que fijó el coordinador del recorrido compartido, o None"""
+    for config in configs:
+        if os.path.exists(config.state_file):
+            state = CrawlState(config.state_file)
+            share = state.get_meta("host_share")
+            state.close()
+            if share is not None:
+                return float(share)
+    return None
+
+def join_crawl(configs, host_share=None, **options):
+    """Worker que se une a un recorrido compartido ya sembrado en este mismo equipo
+
+    Sin `host_share` usa la fracción de concurrencia y ritmo por host que guardó el
+    coordinador, para no sumar más peticiones de las que admite el servidor.
+    """
+    if host_share is None:
+        host_share = shared_host_share(configs)
+    if host_share is None:
+        print("⚠️  El coordinador no ha fijado host_share: este worker usa el ritmo por host completo")
+        host_share = 1.0
+    asyncio.run(crawl_sites(configs, worker=new_worker_id(), coordinator=False,
+                            host_share=host_share, **options))
+
+def crawl_shared(configs, workers, shard_by=SHARD_BY, parse_workers=PARSE_WORKERS, resume=False,
+                 retry_failed=False, **options):
+    """Recorrido compartido: este proceso coordina y `workers - 1` procesos locales se unen
+
+    Se pueden unir más workers con join_crawl (main.py --join). La frontera vive en
+    la base de datos SQLite en modo WAL, que solo funciona entre procesos del mismo
+    equipo: no sirve sobre un disco de red.
+    """
+    # Los procesos de análisis se reparten entre los workers de este equipo
+    parse_workers = max(1, parse_workers // workers)
+    # Por URL todos los workers piden al mismo host, así que se reparten su concurrencia
+    # y su ritmo; por host cada host está en un solo worker y le corresponde entero
+    options.setdefault("host_share", 1.0 / workers if shard_by == "url" else 1.0)
+    # Los workers que se unan después con --join leen la misma fracción
+    for config in configs:
+        state = CrawlState(config.state_file)
+        state.set_meta("host_share", options["host_share"])
+        state.close()
+    context = multiprocessing.get_context("spawn")
+    helpers = [
+        context.Process(target=join_crawl, args=(configs,),
+                        kwargs=dict(options, parse_workers=parse_workers))
+        for _ in range(workers - 1)
+    ]
+    for helper in helpers:
+        helper.start()
+    try:
+        return asyncio.run(crawl_sites(
+            configs, parse_workers=parse_workers, resume=resume, retry_failed=retry_failed,
+            worker=new_worker_id(), coordinator=True, shard_by=shard_by, **options,
+        ))
+    finally:
+        for helper in helpers:
+            helper.join()
@@ -1,6 +1,11 @@
 import os
+import re
+import argparse
 from pathlib import Path
 
+from organize_docs import STRUCTURE
+from store import PageStore
+
 ORGANIZED_DIR = "adk_docs_organized"
 OUTPUT_FILE = "ADK_DOCUMENTACION_COMPLETA.md"
 
@@ -65,11 +70,49 @@ def read_file_content(filepath):
     except Exception as e:
         return f"Error leyendo {filepath}: {e}"
 
+def fenced(text):
+    """Encierra la página en un bloque de código que sus propios bloques ``` no cierran"""
+    # Una valla más larga que cualquier secuencia de ` del texto, como extraction._fence
+    longest = max((len(run) for run in re.findall("`+", text)), default=0)
+    fence = "`" * max(3, longest + 1)
+    return f"{fence}\n{text}\n{fence}"
+
 def clean_filename(filename):
     """Limpia el nombre del archivo para mostrar"""
     return filename.replace('adk_docs_', '').replace('.txt', '').replace('_', ' ').title()
 
-def consolidate_documentation():
+def section_items(section_dir, store=None):
+    """Subsecciones (o None para archivos directos) con sus (archivo, contenido)
+
+    Sin almacén se recorre ORGANIZED_DIR; con él las páginas se leen directamente
+    según STRUCTURE, en el mismo orden y sin pasar por organize_docs.py.
+    """
+    if store is not None:
+        groups = STRUCTURE[section_dir]
+        groups = sorted(groups.items()) if isinstance(groups, dict) else [(None, groups)]
+        items = []
+        for subsection, files in groups:
+            pages = [(filename, store.read(filename)) for filename in sorted(files)]
+            pages = [(filename, text.strip()) for filename, text in pages if text is not None]
+            if subsection is not None:
+                items.append((subsection, pages))
+            else:
+                items.extend((None, [page]) for page in pages)
+        return items
+
+    section_path = os.path.join(ORGANIZED_DIR, section_dir)
+    items = []
+    for item in sorted(os.listdir(section_path)):
+        item_path = os.path.join(section_path, item)
+        if os.path.isdir(item_path):
+            subfiles = sorted([f for f in os.listdir(item_path) if f.endswith('.txt')])
+            items.append((item, [(subfile, read_file_content(os.path.join(item_path, subfile)))
+                                 for subfile in subfiles]))
+        elif item.endswith('.txt'):
+            items.append((None, [(item, read_file_content(item_path))]))
+    return items
+
+def consolidate_documentation(store=None):
     """Consolida toda la documentación en un archivo maestro"""
     
     content = ["""# Agent Development Kit (ADK) - Documentación Completa
@@ -101,9 +144,10 @@ Este documento contiene la documentación completa del framework ADK (Agent Deve
     total_files = 0
     
     for section_dir in SECTION_ORDER:
-        section_path = os.path.join(ORGANIZED_DIR, section_dir)
-        
-        if not os.path.exists(section_path):
+        if store is not None:
+            if section_dir not in STRUCTURE:
+                continue
+        elif not os.path.exists(os.path.join(ORGANIZED_DIR, section_dir)):
             continue
             
         # Título de la sección principal
@@ -112,35 +156,28 @@ Este documento contiene la documentación completa del framework ADK (Agent Deve
         content.append("=" * len(section_title) + "\n\n")
         
         # Procesar subsecciones o archivos directos
-        items = sorted(os.listdir(section_path))
-        
-        for item in items:
-            item_path = os.path.join(section_path, item)
-            
-            if os.path.isdir(item_path):
+        for subsection, pages in section_items(section_dir, store):
+            if subsection is not None:
                 # Es una subsección
-                subsection_title = SUBSECTION_TITLES.get(item, item.replace('_', ' ').title())
+                subsection_title = SUBSECTION_TITLES.get(subsection, subsection.replace('_', ' ').title())
                 content.append(f"## {subsection_title}\n")
                 content.append("-" * len(subsection_title) + "\n\n")
                 
                 # Procesar archivos en la subsección
-                subfiles = sorted([f for f in os.listdir(item_path) if f.endswith('.txt')])
-                for subfile in subfiles:
-                    subfile_path = os.path.join(item_path, subfile)
+                for subfile, file_content in pages:
                     file_title = clean_filename(subfile)
                     
                     content.append(f"### {file_title}\n\n")
-                    file_content = read_file_content(subfile_path)
-                    content.append(f"```\n{file_content}\n```\n\n")
+                    content.append(f"{fenced(file_content)}\n\n")
                     total_files += 1
                     
-            elif item.endswith('.txt'):
+            else:
                 # Es un archivo directo
-                file_title = clean_filename(item)
-                content.append(f"## {file_title}\n\n")
-                file_content = read_file_content(item_path)
-                content.append(f"```\n{file_content}\n```\n\n")
-                total_files += 1
+                for item, file_content in pages:
+                    file_title = clean_filename(item)
+                    content.append(f"## {file_title}\n\n")
+                    content.append(f"{fenced(file_content)}\n\n")
+                    total_files += 1
         
         content.append("\n---\n\n")
     
@@ -168,9 +205,17 @@ Este documento está optimizado para ser procesado por LLMs y proporciona una co
     return ''.join(content), total_files
 
 def main():
+    parser = argparse.ArgumentParser(description="Consolida la documentación organizada en un único Markdown")
+    parser.add_argument("--store", metavar="FICHERO",
+                        help=f"Lee las páginas del almacén creado con main.py --store en lugar de {ORGANIZED_DIR}")
+    args = parser.parse_args()
+
     print("🚀 Consolidando documentación del ADK...")
     
-    consolidated_content, total_files = consolidate_documentation()
+    store = PageStore(args.store) if args.store else None
+    consolidated_content, total_files = consolidate_documentation(store)
+    if store is not None:
+        store.close()
     
     # Escribir archivo consolidado
     with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
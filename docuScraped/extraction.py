@@ -0,0 +1,280 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+from urllib.parse import urljoin
+
+from lxml import etree
+from lxml import html as lxml_html
+from lxml.cssselect import CSSSelector
+
+# Etiquetas que se eliminan antes de extraer el texto (scripts, estilos y navegación)
+STRIP_TAGS = ["script", "style", "nav", "header", "footer"]
+
+_STRIP_XPATH = etree.XPath("|".join(f"//{tag}" for tag in STRIP_TAGS))
+_HREF_XPATH = etree.XPath("//a/@href")
+_META_CHARSET = re.compile(rb"<meta[^>]+charset=[\"']?([\w.:-]+)", re.IGNORECASE)
+
+# Perfil de extracción de un sitio: selectores (CSS o XPath) del contenido principal,
+# que se prueban en orden, y de los elementos que se descartan dentro de él
+ExtractionProfile = namedtuple("ExtractionProfile", ["content", "drop"])
+
+PROFILES = {
+    # Material for MkDocs: el artículo sin anclas ¶, botones ni números de línea
+    "mkdocs": ExtractionProfile(
+        content=("article", ".md-content", "main"),
+        drop=(".headerlink", ".md-content__button", ".md-source-file", ".md-feedback",
+              ".md-clipboard", ".linenos", "button", "svg"),
+    ),
+}
+
+HEADING_TAGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+# Elementos que separan bloques de texto en el Markdown
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "aside", "blockquote", "figure", "figcaption",
+    "details", "summary", "dl", "dt", "dd", "hr", "form", "fieldset", "center", "body",
+}
+# Marca de <br> mientras se normalizan los espacios (los saltos del HTML fuente no cuentan)
+_LINE_BREAK = "\x0b"
+_CODE_LANGUAGE = re.compile(r"(?:^|\s)(?:language|lang|highlight-source)-([\w+#-]+)")
+
+def sniff_encoding(head, default="utf-8"):
+    """Codificación declarada en un <meta> del principio del documento, o la de por defecto"""
+    match = _META_CHARSET.search(head[:4096])
+    return match.group(1).decode("ascii") if match else default
+
+def element_text(root):
+    """Texto del árbol con un fragmento por línea, como get_text(separator="\\n", strip=True)"""
+    parts = (fragment.strip() for fragment in root.itertext())
+    return "\n".join(part for part in parts if part)
+
+def selector_xpath(selector):
+    """Expresión XPath del selector: se usa tal cual si empieza por / o ./; si no, es CSS"""
+    if selector.startswith(("/", "./", "(")):
+        return selector
+    return CSSSelector(selector).path
+
+@lru_cache(maxsize=None)
+def compile_profile(profile):
+    """Selectores compilados del perfil; se cachean porque cada proceso analiza miles de páginas
+
+    Los de descarte (más las STRIP_TAGS) se unen en una sola expresión para recorrer
+    el contenido una única vez.
+    """
+    content = [etree.XPath(selector_xpath(selector)) for selector in profile.content]
+    drop = [f"descendant::{tag}" for tag in STRIP_TAGS]
+    drop += [selector_xpath(selector) for selector in profile.drop]
+    return content, etree.XPath(" | ".join(drop))
+
+def resolve_profile(profile):
+    """Acepta un nombre de PROFILES, un diccionario {content, drop} o un ExtractionProfile"""
+    if profile is None or isinstance(profile, ExtractionProfile):
+        return profile
+    if isinstance(profile, str):
+        return PROFILES[profile]
+    return ExtractionProfile(tuple(profile.get("content", ())), tuple(profile.get("drop", ())))
+
+def _inline_text(element):
+    """Texto de un elemento en línea, con el código entre comillas invertidas"""
+    parts = [element.text or ""]
+    for child in element:
+        if isinstance(child.tag, str):
+            if child.tag == "code":
+                parts.append(f"`{child.text_content().strip()}`")
+            elif child.tag == "br":
+                parts.append(_LINE_BREAK)
+            else:
+                parts.append(_inline_text(child))
+        parts.append(child.tail or "")
+    return "".join(parts)
+
+def _normalize(text):
+    # Espacios colapsados, pero los <br> siguen separando líneas
+    return "\n".join(" ".join(line.split()) for line in text.split(_LINE_BREAK)).strip()
+
+def _code_language(pre):
+    """Lenguaje del bloque según las clases language-x de <pre>, su <code> o su contenedor"""
+    candidates = [pre, pre.getparent()] + list(pre.iter("code"))
+    for element in candidates:
+        if element is not None:
+            match = _CODE_LANGUAGE.search(element.get("class", ""))
+            if match:
+                return match.group(1)
+    return ""
+
+def _fence(pre):
+    code = pre.text_content().strip("\n")
+    # Una valla más larga que cualquier secuencia de ` dentro del código
+    longest = max((len(run) for run in re.findall("`+", code)), default=0)
+    fence = "`" * max(3, longest + 1)
+    return f"{fence}{_code_language(pre)}\n{code}\n{fence}"
+
+def _table(table):
+    rows = []
+    for row in table.iter("tr"):
+        cells = [_normalize(_inline_text(cell)).replace("\n", " ") for cell in row
+                 if isinstance(cell.tag, str) and cell.tag in ("td", "th")]
+        rows.append("| " + " | ".join(cells) + " |")
+        if len(rows) == 1:
+            rows.append("|" + "---|" * len(cells))
+    return "\n".join(rows)
+
+def _list(element):
+    items = []
+    for number, item in enumerate((child for child in element if child.tag == "li"), 1):
+        marker = f"{number}." if element.tag == "ol" else "-"
+        blocks = _blocks(item)
+        body = "\n".join(blocks).replace("\n", "\n" + " " * (len(marker) + 1))
+        items.append(f"{marker} {body}")
+    return "\n".join(items)
+
+def _blocks(element):
+    """Bloques Markdown (encabezados, párrafos, listas, tablas y código) del elemento"""
+    blocks = []
+    inline = [element.text or ""]
+
+    def flush():
+        text = _normalize("".join(inline))
+        if text:
+            blocks.append(text)
+        inline.clear()
+
+    for child in element:
+        tag = child.tag if isinstance(child.tag, str) else None
+        if tag in HEADING_TAGS:
+            flush()
+            title = _normalize(_inline_text(child)).replace("\n", " ")
+            if title:
+                blocks.append("#" * HEADING_TAGS[tag] + " " + title)
+        elif tag == "pre":
+            flush()
+            blocks.append(_fence(child))
+        elif tag in ("ul", "ol"):
+            flush()
+            blocks.append(_list(child))
+        elif tag == "table":
+            flush()
+            blocks.append(_table(child))
+        elif tag in BLOCK_TAGS or tag == "li":
+            flush()
+            blocks.extend(_blocks(child))
+        elif tag == "br":
+            inline.append(_LINE_BREAK)
+        elif tag is not None:
+            inline.append(_inline_text(child) if tag != "code"
+                          else f"`{child.text_content().strip()}`")
+        inline.append(child.tail or "")
+    flush()
+    return blocks
+
+def element_markdown(root):
+    """Markdown del árbol: conserva encabezados y bloques de código para poder trocear por secciones"""
+    return "\n\n".join(block for block in _blocks(root) if block.strip())
+
+def parse_page(document, page_url, encoding=None, profile=None):
+    """Analiza la página una sola vez con lxml y devuelve (texto limpio, enlaces salientes)
+
+    `document` puede ser str o bytes; con bytes se usa `encoding` si se conoce y,
+    si no, la que declare la propia página (o UTF-8). Con un `profile`
+    (ExtractionProfile) solo se convierte el contenido principal, y a Markdown.
+    """
+    if not document or not document.strip():
+        return "", []
+
+    parser = None
+    if isinstance(document, bytes):
+        # Sin codificación conocida se usa la del <meta> o UTF-8, no la adivinanza de libxml2
+        parser = lxml_html.HTMLParser(encoding=encoding or sniff_encoding(document))
+    root = lxml_html.document_fromstring(document, parser=parser)
+
+    # Los enlaces se recogen antes de quitar la navegación, que es donde están casi todos
+    links = []
+    for href in _HREF_XPATH(root):
+        href = href.strip()
+        if href:
+            links.append(urljoin(page_url, href))
+
+    if profile is not None:
+        content_selectors, drop_selector = compile_profile(profile)
+        # El primer selector que encuentra algo; si ninguno, la página entera
+        content = next((found[0] for found in (select(root) for select in content_selectors)
+                        if found), root.find("body") if root.find("body") is not None else root)
+        for element in drop_selector(content):
+            # drop_tree conserva el texto que sigue al elemento
+            if element is not content and element.getparent() is not None:
+                element.drop_tree()
+        return element_markdown(content), sorted(set(links))
+
+    # Se vacían en lugar de eliminarse: así el texto que sigue a la etiqueta sigue
+    # siendo un fragmento aparte, como con decompose() de BeautifulSoup
+    for element in _STRIP_XPATH(root):
+        element.clear(keep_tail=True)
+
+    return element_text(root), sorted(set(links))
+
+class StreamingExtractor:
+    """Extracción incremental: recibe bytes por trozos y escribe el texto a medida que llega
+
+    Usa el analizador de lxml con un objeto destino (interfaz tipo SAX), así que no
+    construye el árbol y la memoria no depende del tamaño de la página. El texto
+    resultante es el mismo que el de parse_page.
+    """
+
+    def __init__(self, out, page_url, encoding=None):
+        self.out = out
+        self.page_url = page_url
+        self.encoding = encoding
+        self.links = set()
+        self._buffer = []
+        self._skip_depth = 0
+        self._first_line = True
+        self._parser = None
+
+    def feed(self, chunk):
+        if self._parser is None:
+            # Sin charset en las cabeceras se mira el <meta> del primer trozo
+            encoding = self.encoding or sniff_encoding(chunk)
+            self._parser = etree.HTMLParser(target=self, encoding=encoding)
+        self._parser.feed(chunk)
+
+    def finish(self):
+        """Procesa lo que quede pendiente y devuelve los enlaces encontrados"""
+        if self._parser is not None:
+            self._parser.close()
+        return sorted(self.links)
+
+    def _flush(self):
+        # Cada etiqueta separa fragmentos de texto, igual que en get_text
+        if not self._buffer:
+            return
+        text = "".join(self._buffer).strip()
+        self._buffer = []
+        if text:
+            if not self._first_line:
+                self.out.write("\n")
+            self.out.write(text)
+            self._first_line = False
+
+    # Interfaz de destino del analizador de lxml
+    def start(self, tag, attrib):
+        self._flush()
+        if self._skip_depth or tag in STRIP_TAGS:
+            self._skip_depth += 1
+        if tag == "a":
+            href = (attrib.get("href") or "").strip()
+            if href:
+                self.links.add(urljoin(self.page_url, href))
+
+    def end(self, tag):
+        self._flush()
+        if self._skip_depth:
+            self._skip_depth -= 1
+
+    def data(self, data):
+        if not self._skip_depth:
+            self._buffer.append(data)
+
+    def comment(self, text):
+        self._flush()
+
+    def close(self):
+        self._flush()
@@ -0,0 +1,198 @@
+import asyncio
+import itertools
+import re
+from collections import Counter
+
+from scope import rule_pattern
+from url_utils import canonicalize_url
+from urlset import BloomFilter, FingerprintSet
+
+# Límites por defecto del recorrido
+MAX_DEPTH = 10
+MAX_PAGES = 5000
+# URLs pendientes que se tienen en memoria; el resto espera en la base de datos del estado
+FRONTIER_MEMORY = 50000
+
+# Pesos de la prioridad (menor puntuación = antes): cada nivel de profundidad resta lo
+# mismo que una unidad de importancia de sección o que duplicar los enlaces entrantes.
+# Los enlaces entrantes cuentan por potencias de dos: así la puntuación de una URL solo
+# cambia unas pocas veces aunque la enlace la barra lateral de todas las páginas.
+DEPTH_WEIGHT = 1.0
+INLINK_WEIGHT = 1.0
+
+class Priorities:
+    """Importancia por sección y cupos por prefijo, con la misma sintaxis que las reglas de alcance
+
+    `sections` es {regla: importancia} (más importancia = antes) y `quotas` es
+    {regla: máximo de URLs}; en ambos cuenta la primera regla que cumple la URL.
+    """
+
+    def __init__(self, sections=None, quotas=None):
+        self.sections = [(re.compile(rule_pattern(rule)).match, weight)
+                         for rule, weight in (sections or {}).items()]
+        self.quotas = [(re.compile(rule_pattern(rule)).match, rule, limit)
+                       for rule, limit in (quotas or {}).items()]
+        self.used = Counter()
+
+    def importance(self, url):
+        for match, weight in self.sections:
+            if match(url):
+                return weight
+        return 0.0
+
+    def take_quota(self, url):
+        """Descuenta la URL del cupo de su prefijo; devuelve False si ya está agotado"""
+        for match, rule, limit in self.quotas:
+            if match(url):
+                if self.used[rule] >= limit:
+                    return False
+                self.used[rule] += 1
+                return True
+        return True
+
+    def count(self, url):
+        """Cuenta en su cupo una URL ya encolada antes (al reanudar), aunque lo pase"""
+        for match, rule, limit in self.quotas:
+            if match(url):
+                self.used[rule] += 1
+                return
+
+    def score(self, url, depth, inlinks=0):
+        inlink_level = (1 + inlinks).bit_length() - 1
+        return DEPTH_WEIGHT * depth - self.importance(url) - INLINK_WEIGHT * inlink_level
+
+class Frontier:
+    """Cola de trabajo deduplicada y ordenada por prioridad
+
+    Sale antes lo menos profundo, lo más enlazado y lo de las secciones importantes
+    (ver Priorities); a igualdad, en orden de descubrimiento, que es un recorrido en
+    anchura. Con un almacén (CrawlState) la cola no crece sin límite: por encima de
+    `memory_budget` URLs las nuevas solo se registran en disco como pendientes y se
+    vuelven a cargar, las de mejor prioridad primero, cuando la cola en memoria baja.
+    Al reanudar se cargan igual, así que se sigue por lo más valioso.
+    """
+
+    def __init__(self, scope, max_depth=MAX_DEPTH, max_pages=MAX_PAGES, state=None,
+                 memory_budget=FRONTIER_MEMORY, bloom=False, priorities=None):
+        # Reglas de alcance (Scope): solo se encolan las URLs que las cumplen
+        self.scope = scope
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.priorities = priorities or Priorities()
+        # Almacén opcional (CrawlState) donde se guarda cada URL descubierta
+        self.state = state
+        # URLs vistas: huellas de 64 bits o, con bloom, un filtro de Bloom delante de la
+        # tabla de URLs del estado (memoria fija; la comprobación exacta se hace en disco)
+        self.bloom = bloom and state is not None
+        self.seen = BloomFilter(max_pages) if self.bloom else FingerprintSet()
+        self.known = 0
+        self.memory_budget = memory_budget if state is not None else None
+        # URLs pendientes que solo están en disco
+        self.spilled = 0
+        # URLs encoladas en memoria: {url: (profundidad, enlaces entrantes, puntuación)}.
+        # Un enlace nuevo que mejora la puntuación vuelve a encolar la URL y la entrada
+        # anterior se descarta al salir; como mucho log2(enlaces) entradas por URL.
+        self.pending = {}
+        self._order = itertools.count()
+        self.queue = asyncio.PriorityQueue()
+
+    def is_known(self, url):
+        if url not in self.seen:
+            return False
+        # El filtro de Bloom puede dar falsos positivos: decide la tabla del estado
+        return not self.bloom or self.state.exists(url)
+
+    def push(self, url, depth, inlinks=0):
+        score = self.priorities.score(url, depth, inlinks)
+        self.pending[url] = (depth, inlinks, score)
+        self.queue.put_nowait((score, next(self._order), url, depth))
+
+    def restore(self):
+        """Recupera del almacén las URLs conocidas (gastando sus cupos) y reencola las pendientes"""
+        for url in self.state.known_urls():
+            self.seen.add(url)
+            self.priorities.count(url)
+            self.known += 1
+        # Todas las pendientes pasan a disco y se cargan las de mejor prioridad
+        self.spilled = self.state.spill_pending()
+        self.refill()
+        return self.qsize()
+
+    def accept(self, url, depth):
+        """True si la URL (ya canónica) es nueva, está dentro de los límites y le queda cupo"""
+        if depth > self.max_depth or not self.scope.allows(url):
+            return False
+        if self.is_known(url):
+            return False
+        if self.known >= self.max_pages:
+            return False
+        return self.priorities.take_quota(url)
+
+    def add(self, url, depth):
+        """Encola la URL si es nueva y está dentro de los límites; devuelve True si se encoló"""
+        url = canonicalize_url(url)
+        entry = self.pending.get(url)
+        if entry is not None:
+            # Otro enlace a una URL que aún espera: sube en la cola si cambia su puntuación
+            depth, inlinks, score = entry
+            if self.priorities.score(url, depth, inlinks + 1) < score:
+                self.push(url, depth, inlinks + 1)
+            else:
+                self.pending[url] = (depth, inlinks + 1, score)
+            return False
+        if not self.accept(url, depth):
+            return False
+
+        self.seen.add(url)
+        self.known += 1
+        # Mientras haya URLs desbordadas, las nuevas también van a disco para que se
+        # ordenen con ellas por prioridad
+        spill = bool(self.spilled or (self.memory_budget and len(self.pending) >= self.memory_budget))
+        if self.state is not None:
+            self.state.add(url, depth, priority=self.priorities.score(url, depth), spilled=spill)
+        if spill:
+            self.spilled += 1
+        else:
+            self.push(url, depth)
+        return True
+
+    def refill(self):
+        """Carga desde disco las URLs desbordadas cuando la cola baja de la mitad del presupuesto"""
+        if not self.spilled:
+            return
+        if not self.memory_budget:
+            # Sin presupuesto (solo al reanudar): todas a memoria
+            rows = self.state.unspill(-1)
+        elif len(self.pending) > self.memory_budget // 2:
+            return
+        else:
+            rows = self.state.unspill(self.memory_budget - len(self.pending))
+        for url, depth in rows:
+            self.push(url, depth)
+        self.spilled = self.spilled - len(rows) if rows else 0
+
+    async def get(self):
+        self.refill()
+        while True:
+            score, _, url, depth = await self.queue.get()
+            entry = self.pending.get(url)
+            if entry is not None and entry[2] == score:
+                del self.pending[url]
+                return url, depth
+            # Entrada obsoleta: la URL se volvió a encolar con mejor puntuación
+            self.queue.task_done()
+
+    def task_done(self):
+        # Se recarga antes de descontar la tarea para que join() no termine con URLs en disco
+        self.refill()
+        self.queue.task_done()
+
+    async def join(self):
+        await self.queue.join()
+
+    def qsize(self):
+        """URLs pendientes, en memoria y en disco"""
+        return len(self.pending) + self.spilled
+
+    def __len__(self):
+        return self.known
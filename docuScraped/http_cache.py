@@ -0,0 +1,91 @@
+import hashlib
+import json
+import sqlite3
+import time
+
+from checkpoint import STATE_FILE, BUSY_TIMEOUT
+
+def content_hash(body):
+    """Hash del cuerpo descargado, para saber si la página cambió"""
+    return hashlib.sha256(body).hexdigest()
+
+class HttpCache:
+    """Caché por URL de validadores HTTP (ETag, Last-Modified), hash del contenido y enlaces"""
+
+    def __init__(self, path=STATE_FILE):
+        self.conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS http_cache (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT NOT NULL,
+                links TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                lastmod TEXT
+            )
+        """)
+        try:
+            # Bases de datos creadas antes de que se guardara el lastmod del sitemap
+            self.conn.execute("ALTER TABLE http_cache ADD COLUMN lastmod TEXT")
+        except sqlite3.OperationalError:
+            pass
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS http_cache_content_hash ON http_cache (content_hash)"
+        )
+        self.conn.commit()
+
+    def get(self, url):
+        """Entrada guardada para la URL, o None si nunca se descargó"""
+        row = self.conn.execute(
+            "SELECT etag, last_modified, content_hash, links, lastmod FROM http_cache WHERE url = ?",
+            (url,),
+        ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, body_hash, links, lastmod = row
+        return {
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_hash": body_hash,
+            # Los enlaces permiten seguir recorriendo sin volver a analizar la página
+            "links": json.loads(links),
+            "lastmod": lastmod,
+        }
+
+    def find_duplicate(self, url, body_hash):
+        """Otra URL ya guardada con exactamente el mismo contenido, o None"""
+        row = self.conn.execute(
+            "SELECT url FROM http_cache WHERE content_hash = ? AND url != ? LIMIT 1",
+            (body_hash, url),
+        ).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def conditional_headers(entry):
+        """Cabeceras If-None-Match / If-Modified-Since para revalidar una entrada"""
+        headers = {}
+        if entry is None:
+            return headers
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url, etag, last_modified, body_hash, links, lastmod=None):
+        self.conn.execute(
+            """
+            INSERT OR REPLACE INTO http_cache
+                (url, etag, last_modified, content_hash, links, updated_at, lastmod)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (url, etag, last_modified, body_hash, json.dumps(links), time.time(), lastmod),
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
@@ -0,0 +1,68 @@
+import aiohttp
+
+# aiohttp descomprime brotli automáticamente si alguna de estas librerías está instalada
+try:
+    import brotli  # noqa: F401
+    HAS_BROTLI = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        HAS_BROTLI = True
+    except ImportError:
+        HAS_BROTLI = False
+
+ACCEPT_ENCODING = "gzip, deflate, br" if HAS_BROTLI else "gzip, deflate"
+
+# Conexiones persistentes: se mantienen abiertas entre páginas del mismo host
+KEEPALIVE_TIMEOUT = 30
+DNS_CACHE_TTL = 300
+
+# Un host caído debe fallar pronto en lugar de agotar el timeout total
+CONNECT_TIMEOUT = 10
+
+class ConnectionStats:
+    """Cuenta las conexiones abiertas y reutilizadas del pool"""
+
+    def __init__(self):
+        self.created = 0
+        self.reused = 0
+
+    async def _on_create(self, session, context, params):
+        self.created += 1
+
+    async def _on_reuse(self, session, context, params):
+        self.reused += 1
+
+    def trace_config(self):
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(self._on_create)
+        trace_config.on_connection_reuseconn.append(self._on_reuse)
+        return trace_config
+
+    @property
+    def reuse_rate(self):
+        total = self.created + self.reused
+        return self.reused / total if total else 0.0
+
+    def summary(self):
+        return (f"{self.created} nuevas, {self.reused} reutilizadas "
+                f"({self.reuse_rate:.0%} de reutilización)")
+
+def create_session(max_concurrency, max_per_host, timeout, stats=None, trace_configs=()):
+    """Sesión única con pool de conexiones keep-alive y compresión, compartida por todos los workers"""
+    connector = aiohttp.TCPConnector(
+        limit=max_concurrency,
+        limit_per_host=max_per_host,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=DNS_CACHE_TTL,
+    )
+    # Hooks de trazas: conexiones reutilizadas y, opcionalmente, tiempos de cada fase de red
+    trace_configs = list(trace_configs)
+    if stats is not None:
+        trace_configs.append(stats.trace_config())
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=timeout, connect=CONNECT_TIMEOUT),
+        headers={"Accept-Encoding": ACCEPT_ENCODING},
+        trace_configs=trace_configs or None,
+    )
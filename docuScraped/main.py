@@ -1,74 +1,23 @@
 import os
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-import time
+import asyncio
+import argparse
+from frontier import MAX_DEPTH, MAX_PAGES, FRONTIER_MEMORY
+from checkpoint import STATE_FILE
+from archive import ARCHIVE_FILE
+from metrics import REPORT_FILE
+from extraction import PROFILES
+from store import PageStore, STORE_FILE
+from scope import DEFAULT_CONTENT_TYPES, MAX_BYTES
+from shared_frontier import SHARD_BY
+from crawler import (
+    SiteConfig, crawl_sites, crawl_shared, join_crawl, load_site_configs, watch_sites,
+    MAX_CONCURRENCY, MAX_PER_HOST, PARSE_WORKERS, STREAM_THRESHOLD, WATCH_MIN_SLEEP,
+)
 
+# Sitio por defecto cuando no se pasa ningún --site
 BASE_URL = "https://google.github.io/adk-docs/"
 OUTPUT_DIR = "adk_docs_txt"
 
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-def get_page(url):
-    print(f"Descargando: {url}")
-    try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        return response.text
-    except Exception as e:
-        print(f"❌ Error al descargar {url}: {e}")
-        return None
-
-def save_text(html, filename):
-    soup = BeautifulSoup(html, "html.parser")
-    
-    # Quita scripts, estilos y navegación para limpiar el texto
-    for tag in soup(["script", "style", "nav", "header", "footer"]):
-        tag.decompose()
-    
-    text = soup.get_text(separator="\n", strip=True)
-
-    with open(os.path.join(OUTPUT_DIR, filename), "w", encoding="utf-8") as f:
-        f.write(text)
-    
-    print(f"✅ Guardado: {filename}")
-
-def extract_all_links(html):
-    soup = BeautifulSoup(html, "html.parser")
-    
-    # Buscar enlaces en diferentes elementos de navegación
-    nav_elements = soup.find_all(["nav", "aside", "div"], class_=lambda x: x and any(
-        nav_class in str(x).lower() for nav_class in ["nav", "sidebar", "menu", "toc"]
-    ))
-    
-    links = set()
-    
-    # También buscar todos los enlaces internos
-    all_links = soup.find_all("a", href=True)
-    
-    for a in all_links:
-        href = a.get('href', '')
-        if href:
-            full_url = urljoin(BASE_URL, href)
-            # Solo incluir enlaces del mismo dominio
-            if urlparse(full_url).netloc == urlparse(BASE_URL).netloc:
-                links.add(full_url)
-    
-    return sorted(links)
-
-def get_filename_from_url(url):
-    """Genera un nombre de archivo limpio basado en la URL"""
-    path = urlparse(url).path.strip('/')
-    if not path:
-        return "index.txt"
-    
-    # Reemplazar caracteres especiales y crear nombre de archivo
-    filename = path.replace('/', '_').replace('-', '_')
-    if not filename.endswith('.txt'):
-        filename += '.txt'
-    
-    return filename
-
 # URLs específicas conocidas del framework ADK
 specific_urls = [
     "https://google.github.io/adk-docs/",
@@ -88,43 +37,198 @@ specific_urls = [
     "https://google.github.io/adk-docs/contribute/"
 ]
 
-print("🚀 Iniciando descarga de documentación ADK...")
+def split_rule(value):
+    """Separa "REGLA=VALOR" por el último "=" (las reglas re: pueden llevar alguno)"""
+    rule, _, number = value.rpartition("=")
+    return rule, number
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Descarga documentación web como texto plano (por defecto, la de ADK)"
+    )
+    parser.add_argument("--site", metavar="FICHERO", action="append",
+                        help="Fichero JSON con uno o varios sitios (base_url, output_dir, seed_urls, ...); "
+                             "se puede repetir y todos se recorren a la vez")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY,
+                        help="Peticiones simultáneas en total")
+    parser.add_argument("--per-host", type=int, default=MAX_PER_HOST,
+                        help="Peticiones simultáneas por host")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continúa el recorrido anterior desde el punto de control")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Ignora la caché HTTP y vuelve a descargar y extraer todas las páginas")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="Reintenta las URLs que fallaron en la ejecución anterior")
+    parser.add_argument("--parse-workers", type=int, default=PARSE_WORKERS,
+                        help="Procesos dedicados a extraer el texto de las páginas")
+    parser.add_argument("--stream", action="store_true",
+                        help="Procesa todas las páginas en streaming, no solo las grandes")
+    parser.add_argument("--progress", action="store_true",
+                        help="Muestra una línea de progreso durante el recorrido")
+    parser.add_argument("--frontier-memory", type=int, default=FRONTIER_MEMORY,
+                        help="URLs pendientes en memoria por sitio; el resto espera en la base de datos")
+    parser.add_argument("--bloom", action="store_true",
+                        help="Deduplica URLs con un filtro de Bloom y la base de datos en lugar de "
+                             "huellas en memoria (memoria fija para recorridos enormes)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Procesos que se reparten la frontera (compartida en la base de datos de estado)")
+    parser.add_argument("--join", action="store_true",
+                        help="Se une como worker a un recorrido con --workers ya en marcha en este mismo "
+                             "equipo (la base de datos de estado no admite un disco de red)")
+    parser.add_argument("--host-share", type=float, metavar="FRACCIÓN",
+                        help="Fracción de la concurrencia y del ritmo por host de este worker con "
+                             "--workers o --join (por defecto la reparte el coordinador)")
+    parser.add_argument("--shard-by", choices=["url", "host"], default=SHARD_BY,
+                        help="Reparto entre workers: por URL (un sitio entre todos) o por host "
+                             "(cada host en un solo worker, respetando su límite de cortesía)")
+    parser.add_argument("--time-budget", type=float, metavar="SEGUNDOS",
+                        help="Deja de empezar páginas pasado este tiempo; lo pendiente sigue con --resume")
+    parser.add_argument("--page-budget", type=int, metavar="N",
+                        help="Deja de empezar páginas tras N URLs (por sitio y worker)")
+    parser.add_argument("--no-schedule", action="store_true",
+                        help="Revalida todas las páginas guardadas, les toque o no según su tasa de cambio")
+    parser.add_argument("--watch", action="store_true",
+                        help="No termina: repite el recorrido cada vez que vence la revisión de alguna página")
+    parser.add_argument("--watch-min-sleep", type=int, default=WATCH_MIN_SLEEP,
+                        help="Segundos mínimos entre dos pasadas en modo --watch")
+
+    # Opciones del sitio por defecto; con --site cada sitio las lleva en su configuración
+    site = parser.add_argument_group("sitio por defecto (sin --site)")
+    site.add_argument("--max-depth", type=int, default=MAX_DEPTH,
+                      help="Profundidad máxima de enlaces desde la página principal")
+    site.add_argument("--max-pages", type=int, default=MAX_PAGES,
+                      help="Número máximo de páginas a descargar")
+    site.add_argument("--prefix", default=BASE_URL,
+                      help="Solo se siguen enlaces que empiecen por este prefijo")
+    site.add_argument("--include", metavar="REGLA", action="append",
+                      help="Solo se siguen las URLs que cumplen alguna de estas reglas (prefix:, glob: "
+                           "o re:); sustituye a --prefix y se puede repetir")
+    site.add_argument("--exclude", metavar="REGLA", action="append",
+                      help="Nunca se siguen las URLs que cumplen esta regla; se puede repetir y "
+                           "sustituye a la lista por defecto de recursos estáticos")
+    site.add_argument("--content-type", metavar="TIPO", action="append",
+                      help="Tipos de contenido que se analizan; el resto se corta tras las cabeceras "
+                           f"(por defecto {', '.join(DEFAULT_CONTENT_TYPES)})")
+    site.add_argument("--max-bytes", type=int, default=MAX_BYTES,
+                      help="Tamaño máximo de una respuesta; se corta al pasarlo (0 = sin límite)")
+    site.add_argument("--section", metavar="REGLA=PESO", action="append", default=[],
+                      help="Importancia de una sección en la cola (más peso = antes; un nivel de "
+                           "profundidad cuenta 1); se puede repetir")
+    site.add_argument("--quota", metavar="REGLA=N", action="append", default=[],
+                      help="Máximo de URLs que se encolan de una sección; se puede repetir")
+    site.add_argument("--state-file", default=STATE_FILE,
+                      help="Base de datos SQLite con el punto de control del recorrido")
+    site.add_argument("--no-sitemap", action="store_true",
+                      help="No usa sitemap.xml para descubrir páginas")
+    site.add_argument("--profile", default="mkdocs", choices=sorted(PROFILES) + ["none"],
+                      help="Perfil de extracción del contenido principal como Markdown; "
+                           "con none se guarda el texto de toda la página")
+    site.add_argument("--keep-boilerplate", action="store_true",
+                      help="No quita el texto que se repite en todas las páginas")
+    site.add_argument("--archive", metavar="FICHERO", nargs="?", const=ARCHIVE_FILE,
+                      help="Guarda las respuestas en bruto en un archivo WARC comprimido "
+                           f"(por defecto {ARCHIVE_FILE}) para re-extraer con reextract.py; "
+                           "no admite --workers ni --join")
+    site.add_argument("--store", metavar="FICHERO", nargs="?", const=STORE_FILE,
+                      help="Guarda las páginas comprimidas en un único fichero SQLite "
+                           f"(por defecto {STORE_FILE}) en lugar de un .txt por página")
+    site.add_argument("--report", metavar="FICHERO", nargs="?", const=REPORT_FILE,
+                      help="Escribe un informe JSON con tiempos, bytes, estados y colas "
+                           f"(por defecto {REPORT_FILE})")
+    args = parser.parse_args()
+    if args.watch and (args.workers > 1 or args.join):
+        parser.error("--watch no se puede combinar con --workers ni con --join")
+    if args.host_share is not None and not 0 < args.host_share <= 1:
+        parser.error("--host-share debe estar entre 0 y 1")
+
+    if args.site:
+        configs = [config for path in args.site for config in load_site_configs(path)]
+    else:
+        configs = [SiteConfig(
+            BASE_URL, OUTPUT_DIR, specific_urls,
+            allowed_prefix=args.prefix,
+            include=args.include,
+            exclude=args.exclude,
+            content_types=args.content_type or DEFAULT_CONTENT_TYPES,
+            max_bytes=args.max_bytes,
+            sections={rule: float(weight) for rule, weight in map(split_rule, args.section)},
+            quotas={rule: int(limit) for rule, limit in map(split_rule, args.quota)},
+            state_file=args.state_file,
+            archive_file=args.archive,
+            report_file=args.report,
+            store_file=args.store,
+            max_depth=args.max_depth,
+            max_pages=args.max_pages,
+            use_sitemap=not args.no_sitemap,
+            strip_boilerplate=not args.keep_boilerplate,
+            profile=None if args.profile == "none" else args.profile,
+        )]
+
+    if (args.workers > 1 or args.join) and any(config.archive_file for config in configs):
+        # Cada worker añadiría miembros gzip al mismo fichero y el índice apuntaría a offsets ajenos
+        parser.error("--archive no se puede combinar con --workers ni con --join")
+
+    print(f"🚀 Iniciando descarga de documentación: {', '.join(config.name for config in configs)}")
+
+    if args.watch:
+        try:
+            asyncio.run(watch_sites(
+                configs, args.concurrency, args.per_host, args.parse_workers,
+                args.resume, args.refresh, args.retry_failed,
+                0 if args.stream else STREAM_THRESHOLD, args.progress, args.watch_min_sleep,
+                args.frontier_memory, args.bloom, args.time_budget, args.page_budget,
+                not args.no_schedule,
+            ))
+        except KeyboardInterrupt:
+            print("👋 Vigilancia detenida")
+        return
 
-# Conjunto para evitar duplicados
-visited_urls = set()
-all_urls = set(specific_urls)
+    options = dict(
+        max_concurrency=args.concurrency,
+        max_per_host=args.per_host,
+        refresh=args.refresh,
+        stream_threshold=0 if args.stream else STREAM_THRESHOLD,
+        use_schedule=not args.no_schedule,
+        bloom=args.bloom,
+        time_budget=args.time_budget,
+        page_budget=args.page_budget,
+    )
+    if args.host_share is not None:
+        options["host_share"] = args.host_share
+    if args.join:
+        join_crawl(configs, parse_workers=args.parse_workers, **options)
+        print("✅ Worker terminado: no quedan URLs pendientes en la frontera compartida")
+        return
+    if args.workers > 1:
+        crawlers = crawl_shared(configs, args.workers, args.shard_by, args.parse_workers,
+                                args.resume, args.retry_failed, progress=args.progress, **options)
+    else:
+        crawlers = asyncio.run(crawl_sites(
+            configs, args.concurrency, args.per_host, args.parse_workers,
+            args.resume, args.refresh, args.retry_failed,
+            0 if args.stream else STREAM_THRESHOLD, args.progress, not args.no_schedule,
+            args.frontier_memory, args.bloom,
+            time_budget=args.time_budget, page_budget=args.page_budget,
+        ))
 
-# Paso 1: Página principal para extraer más enlaces
-main_html = get_page(BASE_URL)
-if main_html:
-    save_text(main_html, "index.txt")
-    visited_urls.add(BASE_URL)
-    
-    # Extraer enlaces adicionales de la página principal
-    discovered_links = extract_all_links(main_html)
-    all_urls.update(discovered_links)
-    
-    print(f"📋 Encontrados {len(all_urls)} enlaces totales")
+    for crawler in crawlers:
+        output_dir = crawler.config.output_dir
+        if crawler.config.store_file:
+            store = PageStore(crawler.config.store_file)
+            print(f"✅ Descarga completada! {len(crawler.visited_urls)} páginas guardadas en: "
+                  f"{crawler.config.store_file} ({len(store.filenames())} páginas, "
+                  f"{store.size():,} bytes de texto)")
+            store.close()
+            continue
 
-# Paso 2: Descargar todas las páginas
-for url in sorted(all_urls):
-    if url in visited_urls:
-        continue
-        
-    # Pequeña pausa para no sobrecargar el servidor
-    time.sleep(1)
-    
-    html = get_page(url)
-    if html:
-        filename = get_filename_from_url(url)
-        save_text(html, filename)
-        visited_urls.add(url)
+        print(f"✅ Descarga completada! {len(crawler.visited_urls)} páginas guardadas en: {output_dir}")
+        print(f"📁 Archivos creados:")
 
-print(f"✅ Descarga completada! {len(visited_urls)} páginas guardadas en: {OUTPUT_DIR}")
-print(f"📁 Archivos creados:")
+        # Mostrar lista de archivos creados
+        for filename in sorted(os.listdir(output_dir)):
+            if filename.endswith('.txt'):
+                size = os.path.getsize(os.path.join(output_dir, filename))
+                print(f"  - {filename} ({size} bytes)")
 
-# Mostrar lista de archivos creados
-for filename in sorted(os.listdir(OUTPUT_DIR)):
-    if filename.endswith('.txt'):
-        size = os.path.getsize(os.path.join(OUTPUT_DIR, filename))
-        print(f"  - {filename} ({size} bytes)") 
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import bisect
+import json
+import time
+from collections import Counter
+
+import aiohttp
+
+REPORT_FILE = "crawl_report.json"
+PROGRESS_INTERVAL = 1.0   # Segundos entre muestras de las colas y actualizaciones del progreso
+
+# Límites superiores de los cubos de cada histograma
+TIME_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+SIZE_BUCKETS = [2 ** n for n in range(10, 27)]   # De 1 KB a 64 MB
+DEPTH_BUCKETS = [0, 1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384]
+
+# Fases que se miden en cada URL
+PHASES = ("pool_wait", "dns", "connect", "ttfb", "download", "parse", "write")
+
+class Histogram:
+    """Histograma de cubos fijos: memoria constante sea cual sea el número de muestras"""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)   # El último cubo recoge lo que supera el límite
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, fraction):
+        """Percentil aproximado: el límite superior del cubo donde cae"""
+        if not self.count:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        buckets = {f"<={bound}": count for bound, count in zip(self.bounds, self.counts) if count}
+        if self.counts[-1]:
+            buckets[f">{self.bounds[-1]}"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "buckets": buckets,
+        }
+
+class CrawlMetrics:
+    """Tiempos por URL y por fase, bytes, códigos de estado, reintentos y profundidad de las colas
+
+    Las fases de red (espera de conexión, DNS, conexión) se miden con los hooks de
+    trazas de aiohttp (phase_trace_config); el resto las registra el pipeline. Todo se agrega en
+    histogramas y se vuelca en un informe JSON al terminar. Las filas por URL solo se
+    guardan con `per_url` (cuando hay informe): sin ellas la memoria no crece con el sitio.
+    """
+
+    def __init__(self, per_url=True):
+        self.started = time.monotonic()
+        self.pages = {} if per_url else None
+        self.phases = {phase: Histogram(TIME_BUCKETS) for phase in PHASES}
+        self.sizes = Histogram(SIZE_BUCKETS)
+        self.statuses = Counter()
+        self.outcomes = Counter()
+        self.retries = 0
+        self.bytes = 0
+        self.queues = {}
+
+    def page(self, url):
+        if self.pages is None:
+            # Sin filas por URL: una fila desechable, solo cuentan los agregados
+            return {"retries": 0}
+        if url not in self.pages:
+            self.pages[url] = {"retries": 0}
+        return self.pages[url]
+
+    def record_phase(self, url, phase, seconds):
+        self.page(url)[phase] = seconds
+        self.phases[phase].add(seconds)
+
+    def record_response(self, url, status, size=None):
+        page = self.page(url)
+        page["status"] = status
+        self.statuses[status] += 1
+        if size is not None:
+            page["bytes"] = size
+            self.bytes += size
+            self.sizes.add(size)
+
+    def record_retry(self, url):
+        self.page(url)["retries"] += 1
+        self.retries += 1
+
+    def record_outcome(self, url, outcome):
+        self.page(url)["outcome"] = outcome
+        self.outcomes[outcome] += 1
+
+    def sample_queues(self, **depths):
+        for name, depth in depths.items():
+            self.queues.setdefault(name, Histogram(DEPTH_BUCKETS)).add(depth)
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def progress_line(self, **depths):
+        done = sum(self.outcomes.values())
+        rate = done / self.elapsed if self.elapsed else 0.0
+        queues = " ".join(f"{name}={depth}" for name, depth in depths.items())
+        return (f"📊 {done} páginas ({rate:.1f}/s), {self.bytes / 1e6:.1f} MB, "
+                f"{self.outcomes['error']} errores, {self.retries} reintentos | colas: {queues}")
+
+    def summary(self):
+        parts = []
+        for phase, histogram in self.phases.items():
+            if histogram.count:
+                parts.append(f"{phase} p50={histogram.percentile(0.5) * 1000:.0f}ms "
+                             f"p90={histogram.percentile(0.9) * 1000:.0f}ms")
+        return ", ".join(parts)
+
+    def report(self, **extra):
+        elapsed = self.elapsed
+        done = sum(self.outcomes.values())
+        return {
+            "elapsed": elapsed,
+            "pages": done,
+            "pages_per_second": done / elapsed if elapsed else 0.0,
+            "bytes": self.bytes,
+            "retries": self.retries,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "outcomes": dict(self.outcomes),
+            "phases": {phase: histogram.to_dict() for phase, histogram in self.phases.items()},
+            "sizes": self.sizes.to_dict(),
+            "queues": {name: histogram.to_dict() for name, histogram in self.queues.items()},
+            **extra,
+            "urls": self.pages if self.pages is not None else {},
+        }
+
+    def write_report(self, path, **extra):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(**extra), f, indent=2, ensure_ascii=False)
+
+# Hooks de trazas de aiohttp. Cada petición lleva (métricas, url) en trace_request_ctx,
+# así una sesión compartida por varios sitios anota cada fase en las métricas de su sitio.
+
+async def _on_queued_start(session, context, params):
+    context.queued_at = time.monotonic()
+
+async def _on_queued_end(session, context, params):
+    _record_trace(context, "pool_wait", context.queued_at)
+
+async def _on_dns_start(session, context, params):
+    context.dns_at = time.monotonic()
+
+async def _on_dns_end(session, context, params):
+    _record_trace(context, "dns", context.dns_at)
+
+async def _on_connect_start(session, context, params):
+    context.connect_at = time.monotonic()
+
+async def _on_connect_end(session, context, params):
+    _record_trace(context, "connect", context.connect_at)
+
+def _record_trace(context, phase, started):
+    if context.trace_request_ctx is not None:
+        metrics, url = context.trace_request_ctx
+        metrics.record_phase(url, phase, time.monotonic() - started)
+
+def phase_trace_config():
+    """Trazas que miden la espera de conexión, el DNS y el establecimiento de la conexión"""
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_queued_start.append(_on_queued_start)
+    trace_config.on_connection_queued_end.append(_on_queued_end)
+    trace_config.on_dns_resolvehost_start.append(_on_dns_start)
+    trace_config.on_dns_resolvehost_end.append(_on_dns_end)
+    trace_config.on_connection_create_start.append(_on_connect_start)
+    trace_config.on_connection_create_end.append(_on_connect_end)
+    return trace_config
@@ -1,7 +1,10 @@
 import os
 import shutil
+import argparse
 from pathlib import Path
 
+from store import PageStore
+
 # Directorios
 SOURCE_DIR = "adk_docs_txt"
 ORGANIZED_DIR = "adk_docs_organized"
@@ -144,7 +147,24 @@ def create_directory_structure(base_dir):
             # Crear directorio simple
             os.makedirs(os.path.join(base_dir, section))
 
-def copy_files():
+def copy_page(filename, target_dir, store=None):
+    """Copia una página desde SOURCE_DIR o desde el almacén; devuelve False si no existe"""
+    target_path = os.path.join(target_dir, filename)
+    if store is not None:
+        text = store.read(filename)
+        if text is None:
+            return False
+        with open(target_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return True
+
+    source_path = os.path.join(SOURCE_DIR, filename)
+    if not os.path.exists(source_path):
+        return False
+    shutil.copy2(source_path, target_path)
+    return True
+
+def copy_files(store=None):
     """Copia y organiza los archivos según la estructura"""
     files_copied = 0
     files_not_found = []
@@ -155,10 +175,7 @@ def copy_files():
             for subsection, files in content.items():
                 target_dir = os.path.join(ORGANIZED_DIR, section, subsection)
                 for filename in files:
-                    source_path = os.path.join(SOURCE_DIR, filename)
-                    if os.path.exists(source_path):
-                        target_path = os.path.join(target_dir, filename)
-                        shutil.copy2(source_path, target_path)
+                    if copy_page(filename, target_dir, store):
                         files_copied += 1
                         print(f"✅ Copiado: {filename} -> {section}/{subsection}/")
                     else:
@@ -167,10 +184,7 @@ def copy_files():
             # Sección simple
             target_dir = os.path.join(ORGANIZED_DIR, section)
             for filename in content:
-                source_path = os.path.join(SOURCE_DIR, filename)
-                if os.path.exists(source_path):
-                    target_path = os.path.join(target_dir, filename)
-                    shutil.copy2(source_path, target_path)
+                if copy_page(filename, target_dir, store):
                     files_copied += 1
                     print(f"✅ Copiado: {filename} -> {section}/")
                 else:
@@ -314,6 +328,11 @@ Esta documentación está organizada jerárquicamente para facilitar su comprens
         f.write(index_content)
 
 def main():
+    parser = argparse.ArgumentParser(description="Organiza la documentación descargada por secciones")
+    parser.add_argument("--store", metavar="FICHERO",
+                        help=f"Lee las páginas del almacén creado con main.py --store en lugar de {SOURCE_DIR}")
+    args = parser.parse_args()
+
     print("🚀 Organizando documentación del ADK jerárquicamente...")
     
     # Crear estructura de directorios
@@ -322,7 +341,10 @@ def main():
     
     # Copiar y organizar archivos
     print("📋 Copiando y organizando archivos...")
-    files_copied, files_not_found = copy_files()
+    store = PageStore(args.store) if args.store else None
+    files_copied, files_not_found = copy_files(store)
+    if store is not None:
+        store.close()
     
     # Crear índice maestro
     print("📖 Creando índice maestro...")
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+# Ritmo de peticiones por host (peticiones por segundo)
+INITIAL_RATE = 2.0
+MIN_RATE = 0.2
+MAX_RATE = 20.0
+BURST = 4              # Peticiones que pueden salir seguidas tras un periodo inactivo
+
+# Ajuste adaptativo: subida aditiva con respuestas rápidas, bajada multiplicativa si no
+TARGET_LATENCY = 1.0   # Segundos hasta recibir las cabeceras; por encima se frena
+RATE_INCREASE = 0.25
+SLOW_DECREASE = 0.8
+OVERLOAD_DECREASE = 0.5
+OVERLOAD_STATUSES = (429, 503)
+
+def parse_retry_after(value):
+    """Segundos indicados por una cabecera Retry-After (número o fecha HTTP), o None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+class TokenBucket:
+    """Cubo de tokens de un host: cada petición consume un token que se repone a `rate` por segundo"""
+
+    def __init__(self, rate=INITIAL_RATE, burst=BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        # Instante hasta el que el servidor ha pedido no recibir peticiones (Retry-After)
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        # El cerrojo reparte los tokens por orden de llegada
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self.blocked_until - now
+                if wait <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+                await asyncio.sleep(wait)
+
+class HostRateLimiter:
+    """Limitador por host con cubos de tokens que se adaptan a la respuesta del servidor"""
+
+    def __init__(self, initial_rate=INITIAL_RATE, min_rate=MIN_RATE, max_rate=MAX_RATE,
+                 target_latency=TARGET_LATENCY):
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.target_latency = target_latency
+        self.buckets = {}
+
+    def bucket(self, url):
+        host = urlparse(url).netloc
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.initial_rate)
+        return self.buckets[host]
+
+    async def acquire(self, url):
+        """Espera a que el host de la URL admita una petición más"""
+        await self.bucket(url).acquire()
+
+    def record(self, url, status, latency, retry_after=None):
+        """Ajusta el ritmo del host según el resultado de una petición
+
+        `status` es None si la petición falló sin respuesta (timeout, conexión).
+        """
+        bucket = self.bucket(url)
+        if status in OVERLOAD_STATUSES or status is None:
+            bucket.rate = max(self.min_rate, bucket.rate * OVERLOAD_DECREASE)
+            # Sin Retry-After se deja al menos un intervalo del nuevo ritmo
+            pause = retry_after if retry_after is not None else 1 / bucket.rate
+            bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + pause)
+            bucket.tokens = min(bucket.tokens, 0.0)
+        elif latency > self.target_latency:
+            bucket.rate = max(self.min_rate, bucket.rate * SLOW_DECREASE)
+        else:
+            bucket.rate = min(self.max_rate, bucket.rate + RATE_INCREASE)
+
+    def rates(self):
+        """Ritmo actual de cada host, en peticiones por segundo"""
+        return {host: bucket.rate for host, bucket in self.buckets.items()}
@@ -0,0 +1,110 @@
+import os
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from archive import ARCHIVE_FILE, latest_offsets, read_record
+from boilerplate import strip_boilerplate
+from checkpoint import CrawlState, STATE_FILE
+from crawler import get_filename_from_url
+from extraction import PROFILES, parse_page, resolve_profile
+from main import BASE_URL, OUTPUT_DIR
+from store import PageStore
+
+def charset_from_headers(headers):
+    """Charset declarado en el Content-Type guardado, o None"""
+    for param in headers.get("content-type", "").split(";")[1:]:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "charset":
+            return value.strip().strip('"') or None
+    return None
+
+def reextract_record(archive_path, offset, output_path, profile=None):
+    """Vuelve a extraer el texto de un registro del archivo (se ejecuta en otro proceso)
+
+    Sin `output_path` devuelve el texto para guardarlo en el almacén desde el proceso
+    principal; si no, lo escribe y devuelve su longitud.
+    """
+    url, status, headers, body = read_record(archive_path, offset)
+    text, _ = parse_page(body, url, charset_from_headers(headers), profile)
+    if output_path is None:
+        return text
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return len(text)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Reconstruye los .txt a partir del archivo WARC, sin acceder a la red"
+    )
+    parser.add_argument("--archive", default=ARCHIVE_FILE, help="Archivo creado con main.py --archive")
+    parser.add_argument("--output", default=OUTPUT_DIR, help="Directorio de salida")
+    parser.add_argument("--base-url", default=BASE_URL,
+                        help="URL base del sitio, cuya página se guarda como index.txt")
+    parser.add_argument("--state-file", default=STATE_FILE,
+                        help="Base de datos del recorrido, con los nombres de fichero asignados")
+    parser.add_argument("--store", metavar="FICHERO",
+                        help="Guarda las páginas en este almacén de un único fichero en lugar de --output")
+    parser.add_argument("--profile", default="mkdocs", choices=sorted(PROFILES) + ["none"],
+                        help="Perfil de extracción del contenido principal como Markdown")
+    parser.add_argument("--keep-boilerplate", action="store_true",
+                        help="No quita el texto que se repite en todas las páginas")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="Procesos de extracción en paralelo")
+    args = parser.parse_args()
+
+    print(f"🚀 Re-extrayendo documentación desde {args.archive}...")
+    started = time.perf_counter()
+
+    # Se respetan los nombres (y las colisiones resueltas) del recorrido original
+    filenames = {}
+    if os.path.exists(args.state_file):
+        state = CrawlState(args.state_file)
+        filenames = state.filenames()
+        state.close()
+
+    store = PageStore(args.store) if args.store else None
+    if store is None:
+        os.makedirs(args.output, exist_ok=True)
+    offsets = latest_offsets(args.archive)
+    profile = resolve_profile(None if args.profile == "none" else args.profile)
+
+    total_chars = 0
+    errors = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {}
+        for url, offset in offsets.items():
+            filename = filenames.get(url) or get_filename_from_url(url, args.base_url)
+            output_path = os.path.join(args.output, filename) if store is None else None
+            future = pool.submit(reextract_record, args.archive, offset, output_path, profile)
+            futures[future] = (url, filename)
+
+        for future in as_completed(futures):
+            url, filename = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                errors += 1
+                print(f"❌ Error al re-extraer {filename}: {e}")
+                continue
+            if store is not None:
+                store.write(filename, result, url)
+                result = len(result)
+            total_chars += result
+
+    if store is not None:
+        store.close()
+
+    if not args.keep_boilerplate:
+        # Igual que al terminar un recorrido, con las huellas ya aprendidas en la base de datos
+        learned, changed, _, _ = strip_boilerplate(args.output, args.state_file, args.store)
+        print(f"🧹 Boilerplate: {learned} huellas nuevas, {changed} ficheros limpiados")
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ {len(offsets) - errors} páginas re-extraídas en {elapsed:.2f}s "
+          f"({total_chars:,} caracteres) en: {args.store or args.output}")
+    if errors:
+        print(f"⚠️  {errors} páginas con errores")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import asyncio
+import random
+import time
+from urllib.parse import urlparse
+
+import aiohttp
+
+# Reintentos con espera exponencial y jitter
+MAX_RETRIES = 3
+BACKOFF_BASE = 1.0     # Segundos de espera máxima tras el primer fallo
+BACKOFF_MAX = 30.0
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+# Cortacircuitos por host
+FAILURE_THRESHOLD = 5  # Fallos seguidos que abren el circuito
+COOLDOWN = 60.0        # Segundos con el circuito abierto antes de volver a probar
+
+class CircuitOpenError(Exception):
+    """El host tiene el circuito abierto y no se le envían peticiones"""
+
+def is_retryable(error):
+    """Indica si merece la pena repetir la petición (errores de red, timeouts y 5xx/429)"""
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status in RETRYABLE_STATUSES
+    return isinstance(error, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError,
+                              asyncio.TimeoutError))
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_MAX):
+    """Espera antes del reintento número `attempt` (desde 0), con jitter completo"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+class CircuitBreaker:
+    """Deja de enviar peticiones a un host que falla una y otra vez
+
+    Tras FAILURE_THRESHOLD fallos seguidos el circuito del host se abre y sus URLs
+    se descartan al instante. Pasado el COOLDOWN se deja pasar una única petición
+    de prueba: si funciona el circuito se cierra, y si falla vuelve a abrirse.
+    """
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, cooldown=COOLDOWN):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = {}
+        self.opened_at = {}
+        self.probing = set()
+
+    def blocked(self, url):
+        """Indica si el host está en pausa, sin reservar la petición de prueba"""
+        host = urlparse(url).netloc
+        opened_at = self.opened_at.get(host)
+        if opened_at is None:
+            return False
+        return time.monotonic() - opened_at < self.cooldown or host in self.probing
+
+    def allow(self, url):
+        """Indica si se puede enviar la petición; en semiabierto reserva la prueba"""
+        if self.blocked(url):
+            return False
+        host = urlparse(url).netloc
+        if host not in self.opened_at:
+            return True
+        # Circuito semiabierto: una sola petición de prueba
+        self.probing.add(host)
+        return True
+
+    def record_success(self, url):
+        host = urlparse(url).netloc
+        self.failures[host] = 0
+        self.opened_at.pop(host, None)
+        self.probing.discard(host)
+
+    def record_failure(self, url):
+        host = urlparse(url).netloc
+        self.failures[host] = self.failures.get(host, 0) + 1
+        if host in self.probing or self.failures[host] >= self.failure_threshold:
+            if host not in self.opened_at or host in self.probing:
+                print(f"⛔ Circuito abierto para {host}: se pausa durante {self.cooldown:.0f}s")
+            self.opened_at[host] = time.monotonic()
+            self.probing.discard(host)
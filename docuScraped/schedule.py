@@ -0,0 +1,198 @@
+import argparse
+import math
+import sqlite3
+import time
+
+from checkpoint import STATE_FILE, BUSY_TIMEOUT
+
+# Intervalos de revisita, en segundos
+MIN_INTERVAL = 3600                 # Ni las páginas más volátiles se revisan más de una vez por hora
+MAX_INTERVAL = 30 * 24 * 3600       # Ni las más estables se dejan más de un mes sin revisar
+DEFAULT_INTERVAL = 24 * 3600        # Intervalo tras la primera descarga, sin historial aún
+# Fracción del periodo medio entre cambios a la que se revisita: con 0.5 se pasa dos
+# veces por cada cambio esperado y la copia está al día ~80% del tiempo
+REVISIT_FRACTION = 0.5
+# Sin cambios, el intervalo a lo sumo se duplica en cada revisión en lugar de saltar al máximo
+MAX_GROWTH = 2.0
+
+def change_rate(checks, changes, observed):
+    """Cambios por segundo estimados a partir de `checks` revisiones en `observed` segundos
+
+    Estimador de Cho y Garcia-Molina para revisiones periódicas: corrige que entre
+    dos revisiones pueda haber habido varios cambios y que solo se vea uno.
+    """
+    if checks == 0 or observed <= 0:
+        return None
+    return -math.log((checks - changes + 0.5) / (checks + 0.5)) / (observed / checks)
+
+def revisit_interval(checks, changes, observed, previous):
+    """Segundos hasta la próxima revisión según la tasa de cambio observada"""
+    rate = change_rate(checks, changes, observed)
+    if rate is None:
+        return DEFAULT_INTERVAL
+    interval = REVISIT_FRACTION / rate if rate > 0 else MAX_INTERVAL
+    interval = min(interval, previous * MAX_GROWTH)
+    return max(MIN_INTERVAL, min(MAX_INTERVAL, interval))
+
+class RecrawlSchedule:
+    """Historial de cambios por página (por hash del contenido) y fecha de su próxima revisión"""
+
+    def __init__(self, path=STATE_FILE):
+        self.conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS recrawl_schedule (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                checks INTEGER NOT NULL,
+                changes INTEGER NOT NULL,
+                observed REAL NOT NULL,
+                last_checked REAL NOT NULL,
+                last_changed REAL NOT NULL,
+                interval REAL NOT NULL,
+                next_check REAL NOT NULL
+            )
+        """)
+        # Cada versión distinta de una página y cuándo se vio por primera vez
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS page_versions (
+                url TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                PRIMARY KEY (url, content_hash)
+            )
+        """)
+        # Revisiones fallidas seguidas: cada una aplaza la siguiente el doble
+        try:
+            self.conn.execute("ALTER TABLE recrawl_schedule ADD COLUMN failures INTEGER NOT NULL DEFAULT 0")
+        except sqlite3.OperationalError:
+            pass
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS recrawl_schedule_next_check ON recrawl_schedule (next_check)"
+        )
+        self.conn.commit()
+
+    def due(self, url, now=None):
+        """True si toca revisar la URL (o si nunca se ha revisado)"""
+        row = self.conn.execute(
+            "SELECT next_check FROM recrawl_schedule WHERE url = ?", (url,)
+        ).fetchone()
+        return row is None or row[0] <= (time.time() if now is None else now)
+
+    def observe(self, url, body_hash, now=None):
+        """Registra una revisión de la URL y programa la siguiente; devuelve True si cambió"""
+        now = time.time() if now is None else now
+        row = self.conn.execute(
+            "SELECT content_hash, checks, changes, observed, last_checked, last_changed, interval "
+            "FROM recrawl_schedule WHERE url = ?",
+            (url,),
+        ).fetchone()
+
+        if row is None:
+            changed = True
+            checks = changes = 0
+            observed = 0.0
+            last_changed = now
+            interval = DEFAULT_INTERVAL
+        else:
+            previous_hash, checks, changes, observed, last_checked, last_changed, interval = row
+            changed = body_hash != previous_hash
+            checks += 1
+            changes += changed
+            observed += now - last_checked
+            if changed:
+                last_changed = now
+            interval = revisit_interval(checks, changes, observed, interval)
+
+        self.conn.execute(
+            """
+            INSERT OR REPLACE INTO recrawl_schedule
+                (url, content_hash, checks, changes, observed, last_checked, last_changed,
+                 interval, next_check)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (url, body_hash, checks, changes, observed, now, last_changed, interval, now + interval),
+        )
+        if changed:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO page_versions (url, content_hash, first_seen) VALUES (?, ?, ?)",
+                (url, body_hash, now),
+            )
+        self.conn.commit()
+        return changed
+
+    def fail(self, url, now=None):
+        """Registra una revisión fallida y aplaza la siguiente con espera exponencial
+
+        Sin esto la fecha vencida se queda en el pasado y la vigilancia repite pasadas
+        sin pausa mientras la página siga fallando. El historial de cambios no se toca.
+        """
+        now = time.time() if now is None else now
+        row = self.conn.execute(
+            "SELECT failures FROM recrawl_schedule WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            # Nunca se descargó: no hay caché con la que saltársela, se pide en cada pasada
+            return
+        failures = row[0] + 1
+        delay = min(MAX_INTERVAL, MIN_INTERVAL * 2 ** (failures - 1))
+        self.conn.execute(
+            "UPDATE recrawl_schedule SET failures = ?, next_check = ? WHERE url = ?",
+            (failures, now + delay, url),
+        )
+        self.conn.commit()
+
+    def next_due(self):
+        """Fecha (epoch) de la próxima revisión programada, o None si no hay ninguna
+
+        Solo cuentan las páginas que alcanzó el último recorrido (tabla urls del mismo
+        estado): las que ya no se enlazan no se vuelven a pedir y no deben adelantar la
+        siguiente pasada.
+        """
+        reached = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'urls'"
+        ).fetchone()
+        if not reached:
+            return self.conn.execute("SELECT MIN(next_check) FROM recrawl_schedule").fetchone()[0]
+        return self.conn.execute(
+            "SELECT MIN(next_check) FROM recrawl_schedule WHERE url IN (SELECT url FROM urls)"
+        ).fetchone()[0]
+
+    def pages(self):
+        """(url, revisiones, cambios, intervalo, próxima revisión) de cada página, las más volátiles primero"""
+        return self.conn.execute(
+            "SELECT url, checks, changes, interval, next_check FROM recrawl_schedule "
+            "ORDER BY interval, url"
+        ).fetchall()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+def format_interval(seconds):
+    """Intervalo legible: minutos, horas o días"""
+    if seconds < 3600:
+        return f"{seconds / 60:.0f}min"
+    if seconds < 24 * 3600:
+        return f"{seconds / 3600:.1f}h"
+    return f"{seconds / (24 * 3600):.1f}d"
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Muestra el calendario de revisitas: tasa de cambio y próxima revisión de cada página"
+    )
+    parser.add_argument("--state-file", default=STATE_FILE, help="Base de datos del recorrido")
+    args = parser.parse_args()
+
+    schedule = RecrawlSchedule(args.state_file)
+    now = time.time()
+    rows = schedule.pages()
+    for url, checks, changes, interval, next_check in rows:
+        print(f"  {format_interval(interval):>7}  {changes}/{checks} cambios  "
+              f"próxima en {format_interval(max(0, next_check - now)):>7}  {url}")
+    schedule.close()
+    print(f"🗓️  {len(rows)} páginas programadas")
+
+if __name__ == "__main__":
+    main()
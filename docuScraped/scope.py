@@ -0,0 +1,71 @@
+import fnmatch
+import re
+
+# Recursos que nunca son páginas de documentación: imágenes, estilos, scripts, fuentes,
+# descargas y el índice JSON del buscador de MkDocs
+DEFAULT_EXCLUDE = [
+    r"re:\.(png|jpe?g|gif|svg|ico|webp|avif|css|js|mjs|map|json|xml|txt|woff2?|ttf|otf|eot"
+    r"|zip|gz|tgz|tar|whl|pdf|mp3|mp4|webm)$",
+]
+# Tipos de contenido que se analizan; el resto se corta tras recibir las cabeceras
+DEFAULT_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+# Tamaño máximo del cuerpo (ya descomprimido); una respuesta mayor se corta al pasarlo
+MAX_BYTES = 10 * 1024 * 1024
+
+class OutOfScopeError(Exception):
+    """La respuesta tiene un tipo de contenido fuera de la lista permitida"""
+
+class TooLargeError(OutOfScopeError):
+    """El cuerpo de la respuesta supera el tamaño máximo"""
+
+    def __init__(self, max_bytes):
+        super().__init__(f"más de {max_bytes:,} bytes")
+
+def rule_pattern(rule):
+    """Expresión regular, anclada al inicio de la URL, de una regla de alcance
+
+    Una regla es "prefix:...", "glob:..." o "re:..." (esta última se busca en
+    cualquier parte de la URL). Sin prefijo, es un glob si lleva * ? [ y un
+    prefijo de URL si no.
+    """
+    kind, _, value = rule.partition(":")
+    if kind not in ("prefix", "glob", "re"):
+        kind, value = ("glob" if any(c in rule for c in "*?[") else "prefix"), rule
+    if kind == "prefix":
+        return re.escape(value)
+    if kind == "glob":
+        return fnmatch.translate(value)
+    return f".*?(?:{value})"
+
+class Scope:
+    """Reglas de inclusión y exclusión de URLs compiladas en una sola expresión regular
+
+    Una URL está dentro si cumple alguna regla de `include` y ninguna de `exclude`.
+    Se comprueba antes de encolar, así que lo que queda fuera nunca se descarga.
+    """
+
+    def __init__(self, include, exclude=None, content_types=DEFAULT_CONTENT_TYPES, max_bytes=MAX_BYTES):
+        self.include = list(include)
+        self.exclude = list(DEFAULT_EXCLUDE if exclude is None else exclude)
+        self.content_types = tuple(content_types or ())
+        # Sin límite con None o 0
+        self.max_bytes = max_bytes or None
+
+        pattern = "(?:" + "|".join(rule_pattern(rule) for rule in self.include) + ")"
+        if self.exclude:
+            # Las exclusiones van en un lookahead negativo: una sola búsqueda por URL
+            pattern = "(?!(?:" + "|".join(rule_pattern(rule) for rule in self.exclude) + "))" + pattern
+        self._match = re.compile(pattern).match
+
+    def allows(self, url):
+        return self._match(url) is not None
+
+    def allows_type(self, content_type):
+        """True si el Content-Type está permitido (o no hay lista, o el servidor no lo envía)"""
+        if not self.content_types or not content_type:
+            return True
+        return content_type.split(";")[0].strip().lower() in self.content_types
+
+    def allows_size(self, size):
+        """True si el tamaño (o el Content-Length, si el servidor lo envía) cabe en el límite"""
+        return self.max_bytes is None or size is None or size <= self.max_bytes
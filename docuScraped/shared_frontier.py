@@ -0,0 +1,125 @@
+import asyncio
+import os
+import socket
+import uuid
+from collections import deque
+from urllib.parse import urlparse
+
+from frontier import Frontier, MAX_DEPTH, MAX_PAGES
+from url_utils import canonicalize_url
+from urlset import url_fingerprint
+
+# Particiones en que se reparten las URLs; cada worker vivo se queda una parte
+NUM_SHARDS = 64
+# Por URL: con "url" los workers se reparten un mismo sitio; con "host" cada host
+# queda en un solo worker y su límite de cortesía se respeta entre todos
+SHARD_BY = "url"
+# Tiempo de visibilidad: una URL prestada a un worker que no renueva vuelve a estar pendiente
+LEASE_TIMEOUT = 60
+HEARTBEAT_INTERVAL = LEASE_TIMEOUT / 4
+LEASE_BATCH = 8
+POLL_INTERVAL = 0.05
+
+def new_worker_id():
+    """Identificador único del worker: máquina, proceso y un sufijo aleatorio"""
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+def shard_of(url, shard_by=SHARD_BY, shards=NUM_SHARDS):
+    key = urlparse(url).netloc if shard_by == "host" else url
+    return url_fingerprint(key) % shards
+
+class SharedFrontier(Frontier):
+    """Frontera compartida por varios procesos del mismo equipo a través de la tabla de URLs del estado
+
+    Cada URL pertenece a una partición y cada worker vivo atiende las particiones
+    que le tocan según su posición entre los workers con latido reciente. Las URLs se
+    toman prestadas por tandas con un tiempo de visibilidad que el latido renueva: si
+    un worker muere, sus particiones pasan a los demás y sus URLs vuelven a estar
+    pendientes al vencer el préstamo. El préstamo es atómico, así que ninguna URL
+    se descarga dos veces mientras su worker siga vivo.
+
+    Se prestan primero las de mejor prioridad, calculada al descubrirlas (los enlaces
+    entrantes no se cuentan entre workers) y guardada en la tabla. Los cupos por
+    prefijo se cuentan en cada worker; al reanudar, cada uno parte de todas las URLs
+    ya registradas.
+    """
+
+    def __init__(self, scope, max_depth=MAX_DEPTH, max_pages=MAX_PAGES, state=None, bloom=False,
+                 worker=None, shard_by=SHARD_BY, lease_timeout=LEASE_TIMEOUT, priorities=None):
+        super().__init__(scope, max_depth, max_pages, state, None, bloom, priorities)
+        self.worker = worker or new_worker_id()
+        self.shard_by = shard_by
+        self.lease_timeout = lease_timeout
+        self.shards = []
+        # URLs prestadas a este worker que aún no ha empezado a descargar
+        self.buffer = deque()
+        self.unfinished = 0
+        self.beat()
+
+    def beat(self):
+        """Latido: renueva los préstamos y recalcula el total de URLs entre todos los workers"""
+        self.state.renew(self.worker, self.lease_timeout)
+        # max_pages es global: cuentan las URLs que han registrado todos los workers
+        self.known = self.state.count_urls()
+        self.update_shards()
+
+    def update_shards(self):
+        """Particiones de este worker según su posición entre los workers vivos"""
+        workers = self.state.live_workers(self.lease_timeout)
+        if self.worker in workers:
+            index = workers.index(self.worker)
+            self.shards = [shard for shard in range(NUM_SHARDS) if shard % len(workers) == index]
+
+    async def heartbeat(self):
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            self.beat()
+
+    def add(self, url, depth):
+        """Registra la URL en la frontera compartida; devuelve True si ningún worker la tenía"""
+        url = canonicalize_url(url)
+        if not self.accept(url, depth):
+            return False
+        self.seen.add(url)
+        # La clave primaria de la tabla decide entre workers que descubren la misma URL a la vez
+        if not self.state.add(url, depth, shard_of(url, self.shard_by),
+                              self.priorities.score(url, depth)):
+            return False
+        self.known += 1
+        return True
+
+    def restore(self):
+        """Calcula la partición de las URLs registradas sin reparto (un estado de antes)"""
+        self.state.assign_shards(lambda url: shard_of(url, self.shard_by))
+        for url in self.state.known_urls():
+            self.seen.add(url)
+            self.priorities.count(url)
+        self.known = self.state.count_urls()
+        return self.qsize()
+
+    async def get(self):
+        while not self.buffer:
+            # Un worker que entra o muere cambia el reparto: se comprueba en cada tanda
+            self.update_shards()
+            self.buffer.extend(self.state.lease(self.worker, self.shards, LEASE_BATCH,
+                                                self.lease_timeout))
+            if not self.buffer:
+                await asyncio.sleep(POLL_INTERVAL)
+        self.unfinished += 1
+        return self.buffer.popleft()
+
+    def task_done(self):
+        self.unfinished -= 1
+
+    async def join(self):
+        """Espera a que no quede nada pendiente ni prestado en ningún worker"""
+        while self.unfinished or self.buffer or self.state.outstanding():
+            await asyncio.sleep(POLL_INTERVAL)
+
+    def retire(self):
+        """Al terminar (o al cancelar) devuelve las URLs no descargadas y deja de contar como vivo"""
+        self.buffer.clear()
+        self.state.retire(self.worker)
+
+    def qsize(self):
+        return self.state.outstanding()
@@ -0,0 +1,97 @@
+import zlib
+from urllib.parse import urljoin
+
+from lxml import etree
+
+SITEMAP_PATH = "sitemap.xml"
+MAX_SITEMAPS = 50      # Límite de sitemaps hijos que se siguen desde un índice
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+def _localname(element):
+    return etree.QName(element).localname
+
+class SitemapStream:
+    """Destino de una descarga en streaming que analiza un sitemap.xml o un índice de sitemaps
+
+    Tiene la misma interfaz que PageStream (open/feed/close/discard), así que la
+    descarga pasa por get_page con sus límites, reintentos y cortacircuitos. Acepta
+    sitemaps comprimidos (.xml.gz) y entrega cada página a `on_url(loc, lastmod)` en
+    cuanto la lee, sin acumularlas.
+    """
+
+    def __init__(self, on_url):
+        self.on_url = on_url
+        self.count = 0       # Páginas entregadas
+        self.sitemaps = []   # Sitemaps hijos si el documento es un índice
+
+    def open(self, encoding):
+        self._parser = etree.XMLPullParser(events=("end",))
+        self._decompressor = None
+        self._started = False
+
+    def feed(self, chunk):
+        if not self._started:
+            # Un .xml.gz llega comprimido aunque el servidor no use Content-Encoding
+            if chunk.startswith(GZIP_MAGIC):
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            self._started = True
+        if self._decompressor is not None:
+            chunk = self._decompressor.decompress(chunk)
+        self._parser.feed(chunk)
+        self._read_events()
+
+    def close(self):
+        if self._decompressor is not None:
+            self._parser.feed(self._decompressor.flush())
+        self._parser.close()
+        self._read_events()
+
+    def discard(self):
+        # Las páginas ya entregadas se quedan: repetirlas en un reintento no hace daño
+        self.count = 0
+        self.sitemaps = []
+
+    def _read_events(self):
+        for _, element in self._parser.read_events():
+            name = _localname(element)
+            if name not in ("url", "sitemap"):
+                continue
+
+            fields = {_localname(child): (child.text or "").strip() for child in element}
+            if fields.get("loc"):
+                if name == "url":
+                    self.on_url(fields["loc"], fields.get("lastmod") or None)
+                    self.count += 1
+                else:
+                    self.sitemaps.append((fields["loc"], fields.get("lastmod") or None))
+
+            # Liberar la entrada y las anteriores para que la memoria no crezca
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+async def discover_sitemap_urls(fetch, base_url, on_url, max_sitemaps=MAX_SITEMAPS):
+    """Lee el sitemap del sitio, llama a `on_url(url, lastmod)` por cada página y devuelve cuántas
+
+    `fetch(url, sink)` debe descargar la URL entregando el cuerpo al sink y devolver
+    None si falla. Los índices de sitemaps se recorren hasta max_sitemaps documentos.
+    """
+    pending = [urljoin(base_url, SITEMAP_PATH)]
+    seen = set()
+    count = 0
+
+    while pending and len(seen) < max_sitemaps:
+        sitemap_url = pending.pop(0)
+        if sitemap_url in seen:
+            continue
+        seen.add(sitemap_url)
+
+        stream = SitemapStream(on_url)
+        if await fetch(sitemap_url, stream) is None:
+            continue
+
+        count += stream.count
+        pending.extend(loc for loc, _ in stream.sitemaps)
+
+    return count
@@ -0,0 +1,197 @@
+import argparse
+import hashlib
+import os
+import sqlite3
+import time
+import zlib
+
+from checkpoint import BUSY_TIMEOUT
+
+# Con zstandard instalado las páginas se comprimen con zstd; si no, con zlib
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+STORE_FILE = "adk_docs_store.db"
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 6
+
+def _compress(text):
+    data = text.encode("utf-8")
+    if HAS_ZSTD:
+        return "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return "zlib", zlib.compress(data, ZLIB_LEVEL)
+
+def _decompress(codec, data):
+    if codec == "zstd":
+        if not HAS_ZSTD:
+            raise RuntimeError("El almacén tiene páginas comprimidas con zstd: instala zstandard")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    elif codec == "zlib":
+        data = zlib.decompress(data)
+    return data.decode("utf-8")
+
+class DirectoryStore:
+    """Salida clásica: un .txt por página en un directorio"""
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        os.makedirs(output_dir, exist_ok=True)
+
+    def path(self, filename):
+        return os.path.join(self.output_dir, filename)
+
+    def exists(self, filename):
+        return os.path.exists(self.path(filename))
+
+    def read(self, filename):
+        try:
+            with open(self.path(filename), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def write(self, filename, text, url=None):
+        with open(self.path(filename), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def staging_path(self, filename):
+        """Fichero temporal donde se escribe una página en streaming antes de confirmarla"""
+        return self.path(filename) + ".part"
+
+    def commit_file(self, filename, path, url=None):
+        os.replace(path, self.path(filename))
+
+    def filenames(self):
+        return sorted(name for name in os.listdir(self.output_dir) if name.endswith(".txt"))
+
+    def size(self):
+        return sum(os.path.getsize(self.path(name)) for name in self.filenames())
+
+    def close(self):
+        pass
+
+class PageStore:
+    """Todas las páginas en un único fichero SQLite, comprimidas e indexadas por URL y hash
+
+    Tiene la misma interfaz que DirectoryStore, así que el crawler, la limpieza de
+    boilerplate y los scripts de organización funcionan igual con los dos. Evita
+    decenas de miles de ficheros pequeños y se puede exportar al directorio con export().
+    """
+
+    def __init__(self, path=STORE_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                filename TEXT PRIMARY KEY,
+                url TEXT,
+                content_hash TEXT NOT NULL,
+                codec TEXT NOT NULL,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS pages_url ON pages (url)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS pages_content_hash ON pages (content_hash)")
+        self.conn.commit()
+
+    def exists(self, filename):
+        return self.conn.execute(
+            "SELECT 1 FROM pages WHERE filename = ?", (filename,)
+        ).fetchone() is not None
+
+    def read(self, filename):
+        row = self.conn.execute(
+            "SELECT codec, data FROM pages WHERE filename = ?", (filename,)
+        ).fetchone()
+        return _decompress(*row) if row else None
+
+    def read_url(self, url):
+        """Texto guardado para la URL, o None"""
+        row = self.conn.execute("SELECT codec, data FROM pages WHERE url = ?", (url,)).fetchone()
+        return _decompress(*row) if row else None
+
+    def find_hash(self, text_hash):
+        """Nombres de las páginas cuyo texto tiene este hash"""
+        return [row[0] for row in self.conn.execute(
+            "SELECT filename FROM pages WHERE content_hash = ?", (text_hash,)
+        )]
+
+    def write(self, filename, text, url=None):
+        codec, data = _compress(text)
+        # Sin URL (por ejemplo al quitar el boilerplate) se conserva la que ya tenía
+        self.conn.execute(
+            """
+            INSERT INTO pages (filename, url, content_hash, codec, data, size, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (filename) DO UPDATE SET
+                url = COALESCE(excluded.url, url),
+                content_hash = excluded.content_hash,
+                codec = excluded.codec,
+                data = excluded.data,
+                size = excluded.size,
+                updated_at = excluded.updated_at
+            """,
+            (filename, url, hashlib.sha256(text.encode("utf-8")).hexdigest(), codec, data,
+             len(text.encode("utf-8")), time.time()),
+        )
+        self.conn.commit()
+
+    def staging_path(self, filename):
+        """Temporal junto al almacén; lleva su nombre para no chocar con otro almacén del directorio"""
+        path = os.path.abspath(self.path)
+        return os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{filename}.part")
+
+    def commit_file(self, filename, path, url=None):
+        """Guarda en el almacén la página que se escribió en streaming y borra el temporal"""
+        with open(path, encoding="utf-8") as f:
+            self.write(filename, f.read(), url)
+        os.remove(path)
+
+    def filenames(self):
+        return [row[0] for row in self.conn.execute("SELECT filename FROM pages ORDER BY filename")]
+
+    def size(self):
+        """Tamaño del texto sin comprimir"""
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+    def export(self, output_dir):
+        """Vuelca las páginas a un directorio con un .txt por página; devuelve cuántas"""
+        directory = DirectoryStore(output_dir)
+        count = 0
+        for filename, codec, data in self.conn.execute(
+            "SELECT filename, codec, data FROM pages ORDER BY filename"
+        ):
+            directory.write(filename, _decompress(codec, data))
+            count += 1
+        return count
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+def open_output(output_dir, store_file=None):
+    """Almacén de salida de un sitio: el fichero único si se indica, si no el directorio"""
+    return PageStore(store_file) if store_file else DirectoryStore(output_dir)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Exporta un almacén de páginas a un directorio con un .txt por página"
+    )
+    parser.add_argument("--store", default=STORE_FILE, help="Almacén creado con main.py --store")
+    parser.add_argument("--output", default="adk_docs_txt", help="Directorio de destino")
+    args = parser.parse_args()
+
+    store = PageStore(args.store)
+    count = store.export(args.output)
+    store.close()
+    print(f"✅ {count} páginas exportadas a: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Los módulos del crawler son scripts sueltos en docuScraped/, no un paquete
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
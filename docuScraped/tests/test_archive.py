@@ -0,0 +1,32 @@
+from archive import ArchiveWriter, latest_offsets, read_record
+
+URL = "https://example.com/docs/"
+
+def test_write_and_read_back(tmp_path):
+    path = str(tmp_path / "crawl.warc.gz")
+    archive = ArchiveWriter(path)
+    archive.write_response(URL, 200, {"Content-Type": "text/html", "Content-Encoding": "gzip"}, b"<p>v1</p>")
+    archive.write_response(URL + "other/", 200, {"Content-Type": "text/html"}, b"<p>otra</p>")
+    archive.write_response(URL, 200, {"Content-Type": "text/html"}, b"<p>v2</p>")
+    archive.close()
+
+    offsets = latest_offsets(path)
+    assert set(offsets) == {URL, URL + "other/"}
+    url, status, headers, body = read_record(path, offsets[URL])
+    assert (url, status, body) == (URL, 200, b"<p>v2</p>")
+    assert "content-encoding" not in headers
+
+def test_reopened_archive_knows_its_urls(tmp_path):
+    path = str(tmp_path / "crawl.warc.gz")
+    archive = ArchiveWriter(path)
+    archive.write_response(URL, 200, {}, b"v1")
+    archive.close()
+
+    archive = ArchiveWriter(path)
+    try:
+        assert URL in archive.urls
+        assert URL + "other/" not in archive.urls
+        archive.write_response(URL + "other/", 200, {}, b"v1")
+        assert URL + "other/" in archive.urls
+    finally:
+        archive.close()
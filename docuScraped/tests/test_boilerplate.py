@@ -0,0 +1,20 @@
+from boilerplate import prose_lines
+
+def prose(text):
+    return [line for _, line in prose_lines(text)]
+
+def test_code_blocks_are_skipped():
+    text = "Intro\n\n```python\nimport os\n```\nOutro"
+    assert list(prose_lines(text)) == [(0, "Intro"), (5, "Outro")]
+
+def test_longer_fence_keeps_inner_fences_as_code():
+    text = "Intro\n````markdown\n```python\nprint('hola')\n```\n````\nOutro"
+    assert prose(text) == ["Intro", "Outro"]
+
+def test_fence_with_language_does_not_close_a_block():
+    text = "```\ncódigo\n```python\nmás código\n```\nOutro"
+    assert prose(text) == ["Outro"]
+
+def test_shorter_fence_does_not_close_a_block():
+    text = "`````\n```\nsigue siendo código\n`````\nOutro"
+    assert prose(text) == ["Outro"]
@@ -0,0 +1,108 @@
+import asyncio
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from crawler import Crawler, PageStream, SiteConfig
+from scope import OutOfScopeError, TooLargeError
+
+PAGE = b"<html><body><p>" + b"x" * 1000 + b"</p></body></html>"
+CHUNK = b"<p>" + b"x" * 8185 + b"</p>"   # 8 KB
+
+async def small_page(request):
+    return web.Response(body=PAGE, content_type="text/html")
+
+async def pdf(request):
+    return web.Response(body=b"%PDF-1.4", content_type="application/pdf")
+
+async def announced(request):
+    return web.Response(body=b"x" * 500_000, content_type="text/html")
+
+async def chunked(request):
+    # Sin Content-Length: el tamaño solo se conoce al leerlo
+    response = web.StreamResponse(headers={"Content-Type": "text/html"})
+    response.enable_chunked_encoding()
+    await response.prepare(request)
+    await response.write(b"<html><body>")
+    for _ in range(int(request.query["kb"]) // 8):
+        await response.write(CHUNK)
+    await response.write_eof()
+    return response
+
+async def gzipped(request):
+    # Unos KB en la red que son 5 MB descomprimidos
+    response = web.Response(body=b"<html><body><p>" + b"y" * 5_000_000 + b"</p></body></html>",
+                            content_type="text/html")
+    response.enable_compression(web.ContentCoding.gzip)
+    return response
+
+def fetch(tmp_path, path, max_bytes, stream_threshold=1024 * 1024, sink=False):
+    """Descarga `path` del servidor de prueba con fetch_once y devuelve (Response, sink)"""
+    async def run():
+        app = web.Application()
+        app.router.add_get("/page/", small_page)
+        app.router.add_get("/file.pdf", pdf)
+        app.router.add_get("/announced/", announced)
+        app.router.add_get("/chunked/", chunked)
+        app.router.add_get("/gzip/", gzipped)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        url = f"http://127.0.0.1:{port}{path}"
+        config = SiteConfig(f"http://127.0.0.1:{port}/", str(tmp_path / "out"), max_bytes=max_bytes)
+        stream = PageStream(url, str(tmp_path / "page.part")) if sink else None
+        try:
+            async with aiohttp.ClientSession() as session:
+                crawler = Crawler(config, session, None)
+                response = await crawler.fetch_once(url, None, stream, stream_threshold, config.scope)
+        finally:
+            if stream is not None:
+                stream.discard()
+            await runner.cleanup()
+        return response, stream
+    return asyncio.run(run())
+
+def test_small_page_is_buffered(tmp_path):
+    response, _ = fetch(tmp_path, "/page/", max_bytes=100_000, sink=True)
+    assert response.status == 200
+    assert response.body == PAGE
+
+def test_content_type_is_rejected_after_headers(tmp_path):
+    with pytest.raises(OutOfScopeError) as error:
+        fetch(tmp_path, "/file.pdf", max_bytes=100_000)
+    assert not isinstance(error.value, TooLargeError)
+
+def test_announced_length_over_cap(tmp_path):
+    with pytest.raises(TooLargeError):
+        fetch(tmp_path, "/announced/", max_bytes=100_000, sink=True)
+
+def test_chunked_body_under_threshold_but_over_cap(tmp_path):
+    # Cabe en el búfer de stream_threshold, pero no en max_bytes
+    with pytest.raises(TooLargeError):
+        fetch(tmp_path, "/chunked/?kb=496", max_bytes=100_000, sink=True)
+
+def test_chunked_body_under_cap_is_buffered(tmp_path):
+    response, _ = fetch(tmp_path, "/chunked/?kb=48", max_bytes=100_000, sink=True)
+    assert response.body is not None
+    assert len(response.body) > 48_000
+
+def test_chunked_body_over_threshold_is_streamed(tmp_path):
+    response, stream = fetch(tmp_path, "/chunked/?kb=200", max_bytes=1_000_000,
+                             stream_threshold=100_000, sink=True)
+    assert response.body is None
+    assert stream.content_hash is not None
+
+def test_chunked_body_over_threshold_and_cap(tmp_path):
+    with pytest.raises(TooLargeError):
+        fetch(tmp_path, "/chunked/?kb=400", max_bytes=300_000, stream_threshold=100_000, sink=True)
+
+def test_decompressed_size_counts(tmp_path):
+    with pytest.raises(TooLargeError):
+        fetch(tmp_path, "/gzip/", max_bytes=1_000_000, sink=True)
+
+def test_no_cap(tmp_path):
+    response, _ = fetch(tmp_path, "/chunked/?kb=496", max_bytes=0, sink=True)
+    assert len(response.body) > 496_000
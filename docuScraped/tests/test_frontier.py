@@ -0,0 +1,35 @@
+from checkpoint import CrawlState
+from frontier import Frontier, Priorities
+from scope import Scope
+
+BASE = "https://example.com/docs/"
+
+def frontier_for(state, quotas):
+    return Frontier(Scope([BASE]), state=state, priorities=Priorities(quotas=quotas))
+
+def test_quota_limits_urls_per_section():
+    frontier = Frontier(Scope([BASE]), priorities=Priorities(quotas={BASE + "api/": 2}))
+    assert frontier.add(BASE + "api/a/", 1)
+    assert frontier.add(BASE + "api/b/", 1)
+    assert not frontier.add(BASE + "api/c/", 1)
+    assert frontier.add(BASE + "guide/", 1)
+
+def test_resume_counts_restored_urls_against_quotas(tmp_path):
+    path = str(tmp_path / "state.db")
+    quotas = {BASE + "api/": 2}
+    state = CrawlState(path)
+    frontier = frontier_for(state, quotas)
+    assert frontier.add(BASE + "api/a/", 1)
+    assert frontier.add(BASE + "api/b/", 1)
+    state.mark(BASE + "api/a/", "done")
+    state.close()
+
+    state = CrawlState(path)
+    try:
+        frontier = frontier_for(state, quotas)
+        assert frontier.restore() == 1
+        assert frontier.priorities.used[BASE + "api/"] == 2
+        assert not frontier.add(BASE + "api/c/", 1)
+        assert frontier.add(BASE + "guide/", 1)
+    finally:
+        state.close()
@@ -0,0 +1,99 @@
+import math
+
+import pytest
+
+from checkpoint import CrawlState
+from schedule import (
+    DEFAULT_INTERVAL, MAX_GROWTH, MAX_INTERVAL, MIN_INTERVAL, REVISIT_FRACTION,
+    RecrawlSchedule, change_rate, revisit_interval,
+)
+
+DAY = 24 * 3600
+
+def test_change_rate_without_history():
+    assert change_rate(0, 0, 0) is None
+    assert change_rate(3, 1, 0) is None
+
+def test_change_rate_grows_with_changes():
+    rates = [change_rate(10, changes, 10 * DAY) for changes in range(11)]
+    assert rates[0] == 0
+    assert rates == sorted(rates)
+
+def test_revisit_interval_without_history_is_default():
+    assert revisit_interval(0, 0, 0, DEFAULT_INTERVAL) == DEFAULT_INTERVAL
+
+def test_revisit_interval_follows_estimated_rate():
+    # La mitad de las revisiones diarias vieron un cambio
+    rate = -math.log(5.5 / 10.5) / DAY
+    interval = revisit_interval(10, 5, 10 * DAY, MAX_INTERVAL)
+    assert interval == pytest.approx(REVISIT_FRACTION / rate)
+
+def test_unchanged_page_interval_grows_gradually_up_to_the_maximum():
+    interval = DEFAULT_INTERVAL
+    observed = 0
+    for checks in range(1, 20):
+        observed += interval
+        following = revisit_interval(checks, 0, observed, interval)
+        assert following <= interval * MAX_GROWTH
+        assert following <= MAX_INTERVAL
+        interval = following
+    assert interval == MAX_INTERVAL
+
+def test_always_changing_page_is_checked_at_the_minimum_interval():
+    assert revisit_interval(10, 10, 10 * MIN_INTERVAL, DEFAULT_INTERVAL) == MIN_INTERVAL
+
+def test_schedule_observe_and_due(tmp_path):
+    schedule = RecrawlSchedule(str(tmp_path / "state.db"))
+    url = "https://example.com/docs/"
+    try:
+        assert schedule.due(url, now=0)
+        assert schedule.observe(url, "hash-1", now=0) is True
+        assert not schedule.due(url, now=DEFAULT_INTERVAL - 1)
+        assert schedule.due(url, now=DEFAULT_INTERVAL)
+        assert schedule.next_due() == DEFAULT_INTERVAL
+
+        assert schedule.observe(url, "hash-1", now=DEFAULT_INTERVAL) is False
+        assert schedule.observe(url, "hash-2", now=2 * DEFAULT_INTERVAL) is True
+        (_, checks, changes, _, _), = schedule.pages()
+        assert (checks, changes) == (2, 1)
+    finally:
+        schedule.close()
+
+def test_failures_back_off_and_observe_resets_them(tmp_path):
+    schedule = RecrawlSchedule(str(tmp_path / "state.db"))
+    url = "https://example.com/docs/"
+    try:
+        # Nunca descargada: no hay nada que aplazar
+        schedule.fail(url, now=0)
+        assert schedule.next_due() is None
+
+        schedule.observe(url, "hash-1", now=0)
+        schedule.fail(url, now=DEFAULT_INTERVAL)
+        assert schedule.next_due() == DEFAULT_INTERVAL + MIN_INTERVAL
+        schedule.fail(url, now=DEFAULT_INTERVAL)
+        assert schedule.next_due() == DEFAULT_INTERVAL + 2 * MIN_INTERVAL
+        for _ in range(20):
+            schedule.fail(url, now=DEFAULT_INTERVAL)
+        assert schedule.next_due() == DEFAULT_INTERVAL + MAX_INTERVAL
+
+        # Una revisión que sale bien vuelve al intervalo según la tasa de cambio
+        schedule.observe(url, "hash-1", now=2 * DEFAULT_INTERVAL)
+        schedule.fail(url, now=2 * DEFAULT_INTERVAL)
+        assert schedule.next_due() == 2 * DEFAULT_INTERVAL + MIN_INTERVAL
+    finally:
+        schedule.close()
+
+def test_next_due_ignores_pages_the_last_crawl_did_not_reach(tmp_path):
+    path = str(tmp_path / "state.db")
+    state = CrawlState(path)
+    schedule = RecrawlSchedule(path)
+    try:
+        schedule.observe("https://example.com/gone/", "hash-1", now=0)
+        schedule.observe("https://example.com/kept/", "hash-2", now=10)
+        state.add("https://example.com/kept/", 0)
+        assert schedule.next_due() == 10 + DEFAULT_INTERVAL
+        state.reset()
+        assert schedule.next_due() is None
+    finally:
+        schedule.close()
+        state.close()
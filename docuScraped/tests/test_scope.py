@@ -0,0 +1,69 @@
+import re
+
+import pytest
+
+from scope import Scope, rule_pattern
+
+BASE = "https://google.github.io/adk-docs/"
+
+@pytest.mark.parametrize("rule, url, matches", [
+    # Sin prefijo: prefijo de URL, o glob si lleva comodines
+    (BASE, BASE + "agents/", True),
+    (BASE, "https://google.github.io/other/", False),
+    (BASE + "*/tools/*", BASE + "agents/tools/mcp/", True),
+    (BASE + "*/tools/*", BASE + "tools/", False),
+    # Con prefijo explícito
+    ("prefix:" + BASE + "agents/", BASE + "agents/llm/", True),
+    ("glob:*.pdf", BASE + "guide.pdf", True),
+    ("glob:*.pdf", BASE + "guide.pdf/", False),
+    # re: se busca en cualquier parte de la URL
+    ("re:/api-reference/", BASE + "api-reference/java/", True),
+    ("re:^/api-reference/", BASE + "api-reference/java/", False),
+    # Un prefijo con caracteres especiales de las expresiones regulares se toma literal
+    ("prefix:https://example.com/a+b/", "https://example.com/a+b/c/", True),
+    ("prefix:https://example.com/a+b/", "https://example.com/aab/c/", False),
+])
+def test_rule_pattern(rule, url, matches):
+    assert (re.match(rule_pattern(rule), url) is not None) == matches
+
+def test_default_scope_is_prefix_without_static_assets():
+    scope = Scope([BASE])
+    assert scope.allows(BASE)
+    assert scope.allows(BASE + "get-started/quickstart/")
+    assert not scope.allows("https://google.github.io/adk-python/")
+    for asset in ("assets/logo.png", "assets/app.min.js", "css/site.css", "search/search_index.json",
+                  "sitemap.xml", "downloads/sample.zip"):
+        assert not scope.allows(BASE + asset), asset
+
+def test_exclude_wins_over_include():
+    scope = Scope([BASE], exclude=["re:/api-reference/", "glob:*/tutorials/*"])
+    assert scope.allows(BASE + "agents/")
+    assert not scope.allows(BASE + "api-reference/python/")
+    assert not scope.allows(BASE + "tutorials/agent-team/")
+
+def test_explicit_exclude_replaces_defaults():
+    scope = Scope([BASE], exclude=[])
+    assert scope.allows(BASE + "assets/logo.png")
+
+def test_several_include_rules():
+    scope = Scope([BASE + "agents/", BASE + "tools/"])
+    assert scope.allows(BASE + "agents/llm-agents/")
+    assert scope.allows(BASE + "tools/mcp-tools/")
+    assert not scope.allows(BASE + "deploy/")
+
+@pytest.mark.parametrize("content_type, allowed", [
+    ("text/html", True),
+    ("text/html; charset=utf-8", True),
+    ("Text/HTML", True),
+    ("application/xhtml+xml", True),
+    ("application/pdf", False),
+    ("application/octet-stream", False),
+    # Sin cabecera no se puede decidir: se analiza
+    (None, True),
+    ("", True),
+])
+def test_allows_type(content_type, allowed):
+    assert Scope([BASE]).allows_type(content_type) == allowed
+
+def test_empty_content_type_list_allows_everything():
+    assert Scope([BASE], content_types=()).allows_type("application/pdf")
@@ -0,0 +1,38 @@
+import pytest
+
+from url_utils import canonicalize_url
+
+@pytest.mark.parametrize("url, expected", [
+    # Fragmento, query, puerto por defecto y mayúsculas del esquema y el host
+    ("HTTPS://Google.GitHub.io:443/adk-docs/#top", "https://google.github.io/adk-docs/"),
+    ("https://google.github.io/adk-docs/?utm_source=x", "https://google.github.io/adk-docs/"),
+    ("http://localhost:8080/docs/", "http://localhost:8080/docs/"),
+    # index.html y barra final en las rutas sin extensión, como publica MkDocs
+    ("https://example.com/docs/index.html", "https://example.com/docs/"),
+    ("https://example.com/docs/agents", "https://example.com/docs/agents/"),
+    ("https://example.com/docs/file.pdf", "https://example.com/docs/file.pdf"),
+    ("https://example.com", "https://example.com/"),
+    # Segmentos . y .. y barras repetidas
+    ("https://example.com/a/./b/../c/", "https://example.com/a/c/"),
+    ("https://example.com//a//b/", "https://example.com/a/b/"),
+    # Percent-encoding: se decodifica lo no reservado y se normaliza el resto
+    ("https://example.com/%7euser/", "https://example.com/~user/"),
+    ("https://example.com/p%c3%a1gina/", "https://example.com/p%C3%A1gina/"),
+    ("https://example.com/página/", "https://example.com/p%C3%A1gina/"),
+])
+def test_canonicalize_url(url, expected):
+    assert canonicalize_url(url) == expected
+
+def test_encoded_slash_stays_in_its_segment():
+    # a%2Fb es un único segmento: decodificarlo cambiaría la ruta a a/b
+    assert canonicalize_url("https://example.com/a%2Fb/") == "https://example.com/a%2Fb/"
+    assert canonicalize_url("https://example.com/a%2fb/") == "https://example.com/a%2Fb/"
+    assert canonicalize_url("https://example.com/a%2Fb/") != canonicalize_url("https://example.com/a/b/")
+
+def test_keep_query_sorts_parameters():
+    url = "https://example.com/search?b=2&a=1&a=0"
+    assert canonicalize_url(url, drop_query=False) == "https://example.com/search/?a=0&a=1&b=2"
+
+def test_idempotent():
+    url = "HTTPS://Example.com:443/a/../b/%7Ex/index.html?q=1#f"
+    assert canonicalize_url(canonicalize_url(url)) == canonicalize_url(url)
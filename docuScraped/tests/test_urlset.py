@@ -0,0 +1,44 @@
+from urlset import BloomFilter, FingerprintSet, INITIAL_SLOTS, url_fingerprint
+
+def test_fingerprint_is_stable_and_never_zero():
+    assert url_fingerprint("https://example.com/") == url_fingerprint("https://example.com/")
+    assert url_fingerprint("https://example.com/a/") != url_fingerprint("https://example.com/b/")
+    assert all(url_fingerprint(f"https://example.com/{i}/") != 0 for i in range(1000))
+
+def test_fingerprint_set_add_and_contains():
+    urls = FingerprintSet(["https://example.com/a/"])
+    assert "https://example.com/a/" in urls
+    assert "https://example.com/b/" not in urls
+    assert urls.add("https://example.com/b/") is True
+    assert urls.add("https://example.com/b/") is False
+    assert len(urls) == 2
+
+def test_fingerprint_set_grows_without_losing_urls():
+    total = INITIAL_SLOTS * 4
+    urls = FingerprintSet(f"https://example.com/page_{i}/" for i in range(total))
+    assert len(urls) == total
+    assert all(f"https://example.com/page_{i}/" in urls for i in range(total))
+    assert "https://example.com/page_missing/" not in urls
+    # Nunca pasa de la ocupación máxima: al menos el doble de huecos que URLs
+    assert urls.memory() >= 2 * 8 * total
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000)
+    bloom.update(f"https://example.com/page_{i}/" for i in range(1000))
+    assert all(f"https://example.com/page_{i}/" in bloom for i in range(1000))
+    assert len(bloom) == 1000
+
+def test_bloom_filter_false_positive_rate_near_target():
+    bloom = BloomFilter(10000)
+    bloom.update(f"https://example.com/page_{i}/" for i in range(10000))
+    false_positives = sum(f"https://example.com/other_{i}/" in bloom for i in range(10000))
+    # Objetivo del 1%; margen amplio para que la prueba no dependa de la suerte
+    assert false_positives < 300
+
+def test_bloom_filter_memory_is_fixed():
+    bloom = BloomFilter(10000)
+    before = bloom.memory()
+    bloom.update(f"https://example.com/page_{i}/" for i in range(20000))
+    assert bloom.memory() == before
+    # ~1,2 bytes por URL con un 1% de falsos positivos
+    assert before < 2 * 10000
@@ -0,0 +1,44 @@
+import posixpath
+from urllib.parse import quote, unquote, urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Los sitios de documentación no cambian de contenido según la query (?q=, ?utm_...)
+DROP_QUERY = True
+INDEX_FILES = ("index.html", "index.htm")
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Caracteres que se dejan sin codificar en cada segmento de la ruta (los reservados y no
+# reservados de RFC 3986 salvo la barra: una %2F codificada sigue dentro de su segmento)
+_SEGMENT_SAFE = ":@!$&'()*+,;=-._~"
+
+def canonicalize_url(url, drop_query=DROP_QUERY):
+    """Forma canónica de una URL para que cada página se descargue una sola vez
+
+    Quita el #fragmento, el puerto por defecto, index.html y (por defecto) la query;
+    normaliza mayúsculas del esquema y el host, los segmentos . y .. y el
+    percent-encoding, y añade la barra final a las rutas sin extensión, como
+    publica MkDocs.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    netloc = host if port in (None, DEFAULT_PORTS.get(scheme)) else f"{host}:{port}"
+
+    path = "/".join(quote(unquote(segment), safe=_SEGMENT_SAFE)
+                    for segment in (parts.path or "/").split("/"))
+    trailing_slash = path.endswith("/")
+    path = posixpath.normpath(path)
+    if path.startswith("//"):
+        path = "/" + path.lstrip("/")
+
+    last_segment = posixpath.basename(path)
+    if last_segment in INDEX_FILES:
+        path = posixpath.dirname(path)
+        trailing_slash = True
+    elif last_segment and "." not in last_segment:
+        trailing_slash = True
+    if trailing_slash and not path.endswith("/"):
+        path += "/"
+
+    query = "" if drop_query else urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, path, query, ""))
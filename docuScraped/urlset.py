@@ -0,0 +1,114 @@
+import hashlib
+import math
+from array import array
+
+# Ocupación máxima de la tabla antes de duplicarla (sondeo lineal)
+MAX_LOAD = 0.5
+INITIAL_SLOTS = 1024
+# Falsos positivos del filtro de Bloom; cada uno cuesta una consulta a disco, no un error
+BLOOM_ERROR_RATE = 0.01
+
+def url_fingerprint(url):
+    """Huella de 64 bits de la URL; nunca es 0, que marca un hueco libre en la tabla
+
+    Con un millón de URLs la probabilidad de que dos compartan huella es de ~3e-8.
+    """
+    fingerprint = int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "little")
+    return fingerprint or 1
+
+class FingerprintSet:
+    """Conjunto de URLs guardado como huellas de 64 bits en un array con direccionamiento abierto
+
+    Ocupa ~16 bytes por URL (8 de la huella con la tabla a medio llenar) frente a los
+    ~150 de un set de cadenas, y las URLs no se guardan: solo se puede añadir y consultar.
+    """
+
+    def __init__(self, urls=()):
+        self._slots = array("Q", bytes(8 * INITIAL_SLOTS))
+        self._mask = INITIAL_SLOTS - 1
+        self._count = 0
+        self.update(urls)
+
+    def _find(self, fingerprint):
+        """Índice donde está la huella o, si no está, el hueco libre donde iría"""
+        slots = self._slots
+        i = fingerprint & self._mask
+        while True:
+            slot = slots[i]
+            if slot == fingerprint or slot == 0:
+                return i
+            i = (i + 1) & self._mask
+
+    def _grow(self):
+        old = self._slots
+        self._slots = array("Q", bytes(16 * len(old)))
+        self._mask = len(self._slots) - 1
+        for fingerprint in old:
+            if fingerprint:
+                self._slots[self._find(fingerprint)] = fingerprint
+
+    def add(self, url):
+        """Añade la URL; devuelve True si no estaba"""
+        fingerprint = url_fingerprint(url)
+        i = self._find(fingerprint)
+        if self._slots[i]:
+            return False
+        self._slots[i] = fingerprint
+        self._count += 1
+        if self._count > MAX_LOAD * len(self._slots):
+            self._grow()
+        return True
+
+    def update(self, urls):
+        for url in urls:
+            self.add(url)
+
+    def __contains__(self, url):
+        return self._slots[self._find(url_fingerprint(url))] != 0
+
+    def __len__(self):
+        return self._count
+
+    def memory(self):
+        """Bytes ocupados por la tabla"""
+        return self._slots.itemsize * len(self._slots)
+
+class BloomFilter:
+    """Filtro de Bloom de tamaño fijo: dice "seguro que no está" o "puede que esté"
+
+    Delante de la tabla de URLs del estado evita casi todas las consultas a disco de
+    las URLs nuevas con ~1,2 bytes por URL, sea cual sea la longitud de las URLs.
+    """
+
+    def __init__(self, capacity, error_rate=BLOOM_ERROR_RATE):
+        capacity = max(1, capacity)
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self._count = 0
+
+    def _positions(self, url):
+        # Doble hashing: las k posiciones salen de las dos mitades de la huella de 64 bits
+        fingerprint = url_fingerprint(url)
+        h1 = fingerprint & 0xFFFFFFFF
+        h2 = (fingerprint >> 32) | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, url):
+        for position in self._positions(url):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self._count += 1
+
+    def update(self, urls):
+        for url in urls:
+            self.add(url)
+
+    def __contains__(self, url):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(url))
+
+    def __len__(self):
+        """URLs añadidas (con repeticiones, el filtro no las distingue)"""
+        return self._count
+
+    def memory(self):
+        return len(self._bits)